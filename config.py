@@ -20,16 +20,57 @@ class Config:
     APP_NAME = "CRM Marketing Automation"
     APP_VERSION = "1.0.0"
     
+    # Browser cache lifetime for files served by send_file/static (seconds)
+    SEND_FILE_MAX_AGE_DEFAULT = 12 * 60 * 60
+    
+    # Largest request body Flask will read on any route (bytes)
+    MAX_CONTENT_LENGTH = 64 * 1024
+    
+    # Number of target audience sizes cached for campaign pages
+    AUDIENCE_CACHE_SIZE = int(os.getenv('AUDIENCE_CACHE_SIZE', '256'))
+    
+    # Campaigns per page on the campaigns list and the JSON API (and its cap)
+    CAMPAIGNS_PAGE_SIZE = 50
+    API_MAX_PAGE_SIZE = 200
+    
     # Data File Paths
     CUSTOMERS_DATA_FILE = 'data/customers.json'
     CAMPAIGNS_DATA_FILE = 'data/campaigns.json'
     
+    # Directory holding each campaign's saved segment (one JSON file per campaign)
+    CAMPAIGN_SEGMENTS_DIR = 'data/campaign_segments'
+    
+    # Pickle sidecar caching the parsed customers file (opt-in, e.g.
+    # 'data/customers.pkl'); it is ignored whenever customers.json changes
+    CUSTOMERS_CACHE_FILE = os.getenv('CUSTOMERS_CACHE_FILE') or None
+    
     # Email Configuration (for SMTP strategy)
     SMTP_HOST = os.getenv('SMTP_HOST', 'smtp.gmail.com')
     SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
     SMTP_USER = os.getenv('SMTP_USER', '')
     SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
     
+    # Most SMTP connections open at once, shared by all concurrent launches;
+    # keep within the relay's session limit
+    SMTP_MAX_CONNECTIONS = int(os.getenv('SMTP_MAX_CONNECTIONS', '8'))
+    
+    # Campaign Sending (number of emails sent concurrently on launch)
+    EMAIL_MAX_WORKERS = int(os.getenv('EMAIL_MAX_WORKERS', '32'))
+    
+    # Number of queued campaign launches sent concurrently in the background
+    LAUNCH_QUEUE_WORKERS = int(os.getenv('LAUNCH_QUEUE_WORKERS', '4'))
+    
+    # Seconds without a heartbeat before a 'Sending' campaign is treated as
+    # abandoned (its process died) and moved back to Draft on startup
+    LAUNCH_STALE_AFTER = int(os.getenv('LAUNCH_STALE_AFTER', '300'))
+    
+    # Recipients per send task, and emails between launch progress writes
+    EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', '16'))
+    STATS_FLUSH_INTERVAL = int(os.getenv('STATS_FLUSH_INTERVAL', '200'))
+    
+    # Print every simulated email when using the mock provider
+    MOCK_EMAIL_VERBOSE = os.getenv('MOCK_EMAIL_VERBOSE', 'False').lower() == 'true'
+    
     # Debug Mode
     DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
 
@@ -7,7 +7,7 @@ from datetime import datetime
 from typing import Dict, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Campaign:
     """
     Campaign entity for marketing automation.
@@ -17,9 +17,13 @@ class Campaign:
         title: Campaign title/name
         content_template: Email content template with placeholders (e.g., "Hello {name}...")
         target_segment_criteria: Dictionary containing the segmentation criteria used
-        status: Campaign status ('Draft' or 'Sent')
+        status: Campaign status ('Draft', 'Sending' or 'Sent')
         created_at: Timestamp when campaign was created
         stats: Dictionary containing campaign statistics (sent, opened, clicked)
+        launch_lease: While 'Sending', the process running the launch ('owner')
+            and the time.time() of its last heartbeat ('heartbeat'); else None
+        launch_cursor: ID of the last segment member handled by a launch that
+            hasn't finished yet (where a relaunch resumes); else None
     """
     id: str
     title: str
@@ -28,6 +32,13 @@ class Campaign:
     status: str = 'Draft'
     created_at: Optional[datetime] = None
     stats: Dict[str, int] = field(default_factory=lambda: {'sent': 0, 'opened': 0, 'clicked': 0})
+    launch_lease: Optional[Dict] = None
+    launch_cursor: Optional[str] = None
+    # ISO form of created_at for to_dict(), valid while _iso_source is the
+    # current created_at object (datetimes are immutable, so reassigning
+    # created_at is the only way it can go stale)
+    _created_at_iso: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _iso_source: Optional[datetime] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Set created_at to current time if not provided."""
@@ -35,30 +46,58 @@ class Campaign:
             self.created_at = datetime.now()
     
     def to_dict(self) -> dict:
-        """Convert campaign to dictionary for JSON serialization."""
+        """
+        Convert campaign to dictionary for JSON serialization.
+        
+        Nested dicts are copied, since the repository keeps the returned dict
+        in its cache and later changes to this campaign must not reach it.
+        The created_at string is reused from load time (or the previous call)
+        until created_at is reassigned.
+        """
+        created_at = self.created_at
+        if created_at is not self._iso_source:
+            self._created_at_iso = created_at.isoformat() if isinstance(created_at, datetime) else created_at
+            self._iso_source = created_at
         return {
             'id': self.id,
             'title': self.title,
             'content_template': self.content_template,
-            'target_segment_criteria': self.target_segment_criteria,
+            'target_segment_criteria': dict(self.target_segment_criteria),
             'status': self.status,
-            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            'stats': self.stats
+            'created_at': self._created_at_iso,
+            'stats': dict(self.stats),
+            'launch_lease': dict(self.launch_lease) if self.launch_lease is not None else None,
+            'launch_cursor': self.launch_cursor
         }
     
     @staticmethod
     def from_dict(data: dict) -> 'Campaign':
-        """Create a Campaign instance from a dictionary."""
-        created_at = data.get('created_at')
+        """
+        Create a Campaign instance from a dictionary.
+        
+        Bypasses the generated __init__ and assigns the slots directly, since
+        this runs once per record whenever the repository loads campaigns.
+        """
+        created_at = iso = data.get('created_at')
         if isinstance(created_at, str):
             created_at = datetime.fromisoformat(created_at)
+        elif created_at is None:
+            created_at = datetime.now()
+            iso = None
         
-        return Campaign(
-            id=data['id'],
-            title=data['title'],
-            content_template=data['content_template'],
-            target_segment_criteria=data['target_segment_criteria'],
-            status=data.get('status', 'Draft'),
-            created_at=created_at,
-            stats=data.get('stats', {'sent': 0, 'opened': 0, 'clicked': 0})
-        )
+        campaign = object.__new__(Campaign)
+        campaign.id = data['id']
+        campaign.title = data['title']
+        campaign.content_template = data['content_template']
+        # Copy nested dicts so mutating a campaign never leaks into cached raw data
+        campaign.target_segment_criteria = dict(data['target_segment_criteria'])
+        campaign.status = data.get('status', 'Draft')
+        campaign.created_at = created_at
+        campaign.stats = dict(data.get('stats', {'sent': 0, 'opened': 0, 'clicked': 0}))
+        lease = data.get('launch_lease')
+        campaign.launch_lease = dict(lease) if lease is not None else None
+        campaign.launch_cursor = data.get('launch_cursor')
+        # The stored string already is the ISO form; to_dict() reuses it
+        campaign._created_at_iso = iso
+        campaign._iso_source = created_at if iso is not None else None
+        return campaign
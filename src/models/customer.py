@@ -2,11 +2,11 @@
 Customer Domain Model
 Represents a customer entity in the CRM system with all relevant attributes.
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Customer:
     """
     Customer entity with attributes for segmentation and marketing.
@@ -29,6 +29,11 @@ class Customer:
     spending_score: int
     total_spent: float
     is_active: bool
+    _city_lc: str = field(default='', init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Cache the lowercased city used by case-insensitive city filters."""
+        self._city_lc = self.city.lower()
     
     def to_dict(self) -> dict:
         """Convert customer to dictionary for JSON serialization."""
@@ -45,14 +50,20 @@ class Customer:
     
     @staticmethod
     def from_dict(data: dict) -> 'Customer':
-        """Create a Customer instance from a dictionary."""
-        return Customer(
-            id=data['id'],
-            name=data['name'],
-            email=data['email'],
-            city=data['city'],
-            age=data['age'],
-            spending_score=data['spending_score'],
-            total_spent=data['total_spent'],
-            is_active=data['is_active']
-        )
+        """
+        Create a Customer instance from a dictionary.
+        
+        Bypasses the generated __init__ and assigns the slots directly, since
+        this runs once per record whenever the repository loads customers.
+        """
+        customer = object.__new__(Customer)
+        customer.id = data['id']
+        customer.name = data['name']
+        customer.email = data['email']
+        customer.city = data['city']
+        customer._city_lc = customer.city.lower()
+        customer.age = data['age']
+        customer.spending_score = data['spending_score']
+        customer.total_spent = data['total_spent']
+        customer.is_active = data['is_active']
+        return customer
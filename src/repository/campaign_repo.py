@@ -0,0 +1,225 @@
+"""
+Campaign Repository
+JSON repository specialized for Campaign entities.
+"""
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.models.campaign import Campaign
+from src.repository.json_repo import JsonRepository
+
+
+class CampaignRepository(JsonRepository[Campaign]):
+    """
+    Repository for Campaign entities stored in a JSON file.
+    
+    Binds Campaign.from_dict/to_dict at class level, so callers only pass the
+    file path and the hot deserialization loop calls the model's factory
+    directly instead of going through callables stored on the instance.
+    
+    Saved segment memberships (the customer IDs a campaign targets) are kept
+    out of the campaigns file, one JSON file per campaign in segments_dir, so
+    listing and updating campaigns never reads or rewrites them.
+    """
+    
+    def __init__(self, file_path: str, segments_dir: Optional[str] = None):
+        """
+        Initialize the campaign repository.
+        
+        Args:
+            file_path: Absolute or relative path to the campaigns JSON file
+            segments_dir: Directory holding the saved segment of each campaign
+                (defaults to 'campaign_segments' next to the campaigns file)
+        """
+        super().__init__(file_path, Campaign.from_dict, Campaign.to_dict)
+        self.segments_dir = Path(segments_dir) if segments_dir else self.file_path.parent / 'campaign_segments'
+        # Campaigns ordered newest first, valid for the version it was built at
+        self._sorted_desc: Optional[List[Campaign]] = None
+        self._sorted_version: int = -1
+    
+    def get_all(self) -> List[Campaign]:
+        """
+        Retrieve all campaigns from the repository.
+        
+        Returns:
+            List of Campaign instances
+        """
+        from_dict = Campaign.from_dict
+        return [from_dict(item) for item in self._read_all_raw()]
+    
+    def get_all_sorted_by_created_desc(self) -> List[Campaign]:
+        """
+        Retrieve all campaigns ordered by creation time, most recent first.
+        
+        The ordered list is kept in memory: it is sorted once after the data
+        changes on disk, and save()/delete() keep it in order incrementally.
+        Callers must not mutate the returned list.
+        
+        Returns:
+            List of Campaign instances, newest first
+        """
+        with self._lock:
+            version = self.version
+            if self._sorted_desc is None or version != self._sorted_version:
+                self._sorted_desc = sorted(self.get_all(), key=lambda c: c.created_at, reverse=True)
+                self._sorted_version = version
+            return self._sorted_desc
+    
+    def get_page_sorted_by_created_desc(
+        self,
+        after_id: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[Campaign], bool]:
+        """
+        Retrieve one page of campaigns in newest-first order (keyset pagination).
+        
+        The page starts right after the campaign `after_id`, located by binary
+        search on its creation time in the ordered list, so fetching a page
+        doesn't scan the pages before it.
+        
+        Args:
+            after_id: ID of the last campaign of the previous page (None for
+                the first page)
+            limit: Maximum number of campaigns to return
+        
+        Returns:
+            (campaigns on the page, whether more campaigns follow)
+        
+        Raises:
+            ValueError: If after_id doesn't identify a stored campaign
+        """
+        with self._lock:
+            campaigns = self.get_all_sorted_by_created_desc()
+            start = 0
+            if after_id is not None:
+                anchor = self.get_by_id(after_id)
+                if anchor is None:
+                    raise ValueError(f"Campaign with ID {after_id} not found")
+                start = self._bisect_desc(campaigns, anchor.created_at, after_ties=False)
+                # Step over campaigns created at the same time up to the anchor
+                position = start
+                while position < len(campaigns) and campaigns[position].created_at == anchor.created_at:
+                    position += 1
+                    if campaigns[position - 1].id == after_id:
+                        start = position
+                        break
+            page = campaigns[start:start + limit]
+            return page, start + len(page) < len(campaigns)
+    
+    @staticmethod
+    def _bisect_desc(campaigns: List[Campaign], created_at: datetime, after_ties: bool) -> int:
+        """
+        Binary search a newest-first list for a creation time.
+        
+        Returns the index of the first campaign created before `created_at`
+        (after_ties=True) or at/before it (after_ties=False).
+        """
+        lo, hi = 0, len(campaigns)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = campaigns[mid].created_at
+            if current > created_at or (after_ties and current == created_at):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def _sorted_is_current(self) -> bool:
+        """Whether the ordered list matches the current data version."""
+        return self._sorted_desc is not None and self._sorted_version == self.version
+    
+    def save(self, entity: Campaign) -> Campaign:
+        """
+        Save a new campaign, inserting it into the ordered list if one is kept.
+        
+        Args:
+            entity: The campaign to save
+        
+        Returns:
+            The saved campaign
+        """
+        with self._lock:
+            was_current = self._sorted_is_current()
+            super().save(entity)
+            if was_current:
+                # Store a copy so later changes to the caller's object don't
+                # show up in the list before they're persisted
+                stored = Campaign.from_dict(Campaign.to_dict(entity))
+                # Insert after existing campaigns created at the same time,
+                # matching a stable descending sort of the file order
+                position = self._bisect_desc(self._sorted_desc, stored.created_at, after_ties=True)
+                self._sorted_desc.insert(position, stored)
+                self._sorted_version = self.version
+        return entity
+    
+    def delete(self, entity_id: str) -> bool:
+        """
+        Delete a campaign, removing it from the ordered list if one is kept.
+        
+        Args:
+            entity_id: The unique identifier of the campaign to delete
+        
+        Returns:
+            True if campaign was found and deleted, False otherwise
+        """
+        with self._lock:
+            was_current = self._sorted_is_current()
+            deleted = super().delete(entity_id)
+            if deleted and was_current:
+                self._sorted_desc = [c for c in self._sorted_desc if c.id != entity_id]
+                self._sorted_version = self.version
+        if deleted:
+            self.delete_segment(entity_id)
+        return deleted
+    
+    def _segment_path(self, campaign_id: str) -> Path:
+        """Path of the file holding a campaign's saved segment."""
+        return self.segments_dir / f'{campaign_id}.json'
+    
+    def get_segment(self, campaign_id: str) -> Optional[List[str]]:
+        """
+        Load the saved segment membership of a campaign.
+        
+        Args:
+            campaign_id: The unique identifier of the campaign
+        
+        Returns:
+            Customer IDs in the saved segment, or None if the campaign has no
+            (readable) saved segment
+        """
+        path = self._segment_path(campaign_id)
+        try:
+            with open(path, 'rb') as f:
+                member_ids = self._parse(f, os.fstat(f.fileno()).st_size)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            print(f"⚠️  Saved segment {path} could not be parsed; ignoring it")
+            return None
+        return member_ids if isinstance(member_ids, list) else None
+    
+    def save_segment(self, campaign_id: str, member_ids: List[str]):
+        """
+        Save (or replace) the segment membership of a campaign.
+        
+        Written to a temporary sibling file first and then atomically moved
+        into place, like the campaigns file itself.
+        
+        Args:
+            campaign_id: The unique identifier of the campaign
+            member_ids: Customer IDs in the segment
+        """
+        path = self._segment_path(campaign_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        tmp_path.write_bytes(self._serialize(list(member_ids)))
+        os.replace(tmp_path, path)
+    
+    def delete_segment(self, campaign_id: str):
+        """Remove a campaign's saved segment, if it has one."""
+        try:
+            self._segment_path(campaign_id).unlink()
+        except FileNotFoundError:
+            pass
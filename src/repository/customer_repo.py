@@ -0,0 +1,223 @@
+"""
+Customer Repository
+JSON repository specialized for Customer entities.
+"""
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from src.models.customer import Customer
+from src.repository.json_repo import JsonRepository
+
+# NumPy is optional; without it no column arrays are kept and callers fall
+# back to scanning Customer objects.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class CustomerRepository(JsonRepository[Customer]):
+    """
+    Repository for Customer entities stored in a JSON file.
+    
+    Binds Customer.from_dict/to_dict at class level, so callers only pass the
+    file path and the hot deserialization loop calls the model's factory
+    directly instead of going through callables stored on the instance.
+    """
+    
+    def __init__(self, file_path: str, cache_path: Optional[str] = None):
+        """
+        Initialize the customer repository.
+        
+        Args:
+            file_path: Absolute or relative path to the customers JSON file
+            cache_path: Optional path of a pickle sidecar that caches the
+                parsed customers file between restarts
+        """
+        super().__init__(file_path, Customer.from_dict, Customer.to_dict, cache_path)
+        # Materialized customers, rebuilt only when the data version changes
+        self._entities: Optional[List[Customer]] = None
+        self._entities_version: int = -1
+        # Secondary indexes (value -> positions in self._entities)
+        self._city_index: Dict[str, Tuple[int, ...]] = {}
+        self._active_index: Dict[bool, FrozenSet[int]] = {}
+        self._indexes_source: Optional[List[Customer]] = None
+        # Distinct city names (alphabetical) of the customers in self._entities
+        self._cities_sorted: List[str] = []
+        self._cities_source: Optional[List[Customer]] = None
+        # Column arrays (struct-of-arrays) of the customers in self._entities
+        self._columns: Optional[Tuple[List[Customer], Dict, Dict[str, int]]] = None
+        self._columns_source: Optional[List[Customer]] = None
+    
+    def get_all(self) -> List[Customer]:
+        """
+        Retrieve all customers from the repository.
+        
+        The Customer objects are materialized once per data version (the file's
+        mtime is checked on every call) and the same list is returned until the
+        data changes, so warm reads do no parsing or object construction.
+        Callers must not mutate the returned list or its customers.
+        
+        Returns:
+            List of Customer instances
+        """
+        with self._lock:
+            version = self.version
+            if self._entities is None or version != self._entities_version:
+                from_dict = Customer.from_dict
+                self._entities = [from_dict(item) for item in self._read_all_raw()]
+                self._entities_version = version
+            return self._entities
+    
+    def get_by_ids(self, customer_ids: Iterable[str], limit: Optional[int] = None) -> List[Customer]:
+        """
+        Retrieve customers by ID via the id index, in the order given.
+        
+        IDs that no longer exist are skipped. The returned customers are the
+        shared get_all() instances and must not be mutated.
+        
+        Args:
+            customer_ids: Customer IDs to look up
+            limit: Stop after this many customers (None for all)
+        
+        Returns:
+            List of the Customer instances found
+        """
+        with self._lock:
+            customers = self.get_all()
+            id_index = self._id_index
+            found: List[Customer] = []
+            if limit is not None and limit <= 0:
+                return found
+            for customer_id in customer_ids:
+                position = id_index.get(customer_id)
+                if position is not None:
+                    found.append(customers[position])
+                    if limit is not None and len(found) >= limit:
+                        break
+            return found
+    
+    def count_by_ids(self, customer_ids: Iterable[str]) -> int:
+        """
+        Count how many of the given customer IDs still exist.
+        
+        Args:
+            customer_ids: Customer IDs to look up
+        
+        Returns:
+            Number of IDs found in the id index
+        """
+        with self._lock:
+            self._read_all_raw()
+            id_index = self._id_index
+            return sum(1 for customer_id in customer_ids if customer_id in id_index)
+    
+    def get_indexes(self) -> Tuple[List[Customer], Dict[str, Tuple[int, ...]], Dict[bool, FrozenSet[int]]]:
+        """
+        Return the secondary indexes on city and active status.
+        
+        Each index maps a value to the positions of the matching customers in
+        the get_all() list. The city index (keyed lowercased) is an inverted
+        index of ascending position tuples, so a city's customers can be read
+        off in order without sorting; the active-status index holds frozensets
+        for membership tests. The indexes are rebuilt only when the data
+        version changes.
+        
+        Returns:
+            (customers, city index, active index), where the positions refer
+            to the returned customers list
+        """
+        with self._lock:
+            customers = self.get_all()
+            if customers is not self._indexes_source:
+                by_city: Dict[str, List[int]] = {}
+                by_active: Dict[bool, set] = {True: set(), False: set()}
+                for position, customer in enumerate(customers):
+                    bucket = by_city.get(customer._city_lc)
+                    if bucket is None:
+                        bucket = by_city[customer._city_lc] = []
+                    bucket.append(position)
+                    by_active[bool(customer.is_active)].add(position)
+                self._city_index = {city: tuple(bucket) for city, bucket in by_city.items()}
+                self._active_index = {key: frozenset(bucket) for key, bucket in by_active.items()}
+                self._indexes_source = customers
+            return customers, self._city_index, self._active_index
+    
+    def get_cities_sorted(self) -> List[str]:
+        """
+        Return the distinct customer cities in alphabetical order.
+        
+        Kept with the materialized customers and rebuilt only when the data
+        version changes. Callers must not mutate the returned list.
+        
+        Returns:
+            Sorted list of city names
+        """
+        with self._lock:
+            customers = self.get_all()
+            if customers is not self._cities_source:
+                self._cities_sorted = sorted({c.city for c in customers})
+                self._cities_source = customers
+            return self._cities_sorted
+    
+    def get_columns(self) -> Optional[Tuple[List[Customer], Dict, Dict[str, int]]]:
+        """
+        Return the customer fields as NumPy column arrays.
+        
+        Built once per data version alongside the materialized customers.
+        Cities are lowercased and encoded as integer codes so a city filter is
+        an integer comparison.
+        
+        Returns:
+            (customers, columns, city_codes), where row i of every column
+            describes customers[i]; or None if NumPy is unavailable or the data
+            can't be represented as typed columns
+        """
+        if np is None:
+            return None
+        
+        with self._lock:
+            customers = self.get_all()
+            if customers is not self._columns_source:
+                self._columns = self._build_columns(customers)
+                self._columns_source = customers
+            return self._columns
+    
+    @staticmethod
+    def _build_columns(customers: List[Customer]) -> Optional[Tuple[List[Customer], Dict, Dict[str, int]]]:
+        """
+        Build the column arrays for get_columns().
+        
+        Integer columns (age, spending score, city code) use the narrowest
+        dtype that holds their actual range, typically uint8, so a scan
+        streams as little memory as possible. total_spent stays float64 so
+        comparisons match the Python values exactly.
+        """
+        count = len(customers)
+        city_codes: Dict[str, int] = {}
+        try:
+            columns = {
+                'age': CustomerRepository._narrow(
+                    np.fromiter((c.age for c in customers), dtype=np.int64, count=count)
+                ),
+                'spending_score': CustomerRepository._narrow(
+                    np.fromiter((c.spending_score for c in customers), dtype=np.int64, count=count)
+                ),
+                'total_spent': np.fromiter((c.total_spent for c in customers), dtype=np.float64, count=count),
+                'is_active': np.fromiter((c.is_active for c in customers), dtype=np.bool_, count=count),
+                'city': CustomerRepository._narrow(np.fromiter(
+                    (city_codes.setdefault(c._city_lc, len(city_codes)) for c in customers),
+                    dtype=np.int64,
+                    count=count
+                )),
+            }
+        except (TypeError, ValueError, AttributeError, OverflowError):
+            return None
+        return customers, columns, city_codes
+    
+    @staticmethod
+    def _narrow(values: 'np.ndarray') -> 'np.ndarray':
+        """Cast an integer array to the smallest dtype that holds its values."""
+        if not len(values):
+            return values.astype(np.uint8)
+        dtype = np.result_type(np.min_scalar_type(values.min()), np.min_scalar_type(values.max()))
+        return values.astype(dtype)
@@ -2,13 +2,37 @@
 Repository Pattern Implementation for JSON Data Storage
 Provides generic CRUD operations for JSON files, decoupling data access from business logic.
 """
+import copy
 import json
+import mmap
 import os
-from typing import List, Optional, Callable, TypeVar, Generic
+import pickle
+import threading
+from typing import Any, Dict, List, Optional, Callable, TypeVar, Generic
 from pathlib import Path
 
+# orjson is a C-backed JSON library that parses and serializes several times
+# faster than the stdlib module; fall back to stdlib json if it's unavailable.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 T = TypeVar('T')
 
+# Files at least this large are memory-mapped and parsed in place rather than
+# read into a bytes copy first; below it the mmap setup cost isn't worth it.
+MMAP_THRESHOLD_BYTES = 64 * 1024
+
+# save() appends new records to a journal file next to the data file instead
+# of rewriting it; the journal is folded back into the data file by the next
+# full rewrite, or once it holds this many records.
+JOURNAL_COMPACT_RECORDS = 1000
+
+
+class DataFileError(ValueError):
+    """Raised when a repository's data file exists but cannot be parsed."""
+
 
 class JsonRepository(Generic[T]):
     """
@@ -25,13 +49,33 @@ class JsonRepository(Generic[T]):
         file_path: Path to the JSON data file
         from_dict: Function to deserialize dict to domain model
         to_dict: Function to serialize domain model to dict
+    
+    The parsed file contents are cached in memory and keyed by the file's
+    modification time, so repeated reads cost a couple of stat() calls until
+    the files change on disk. An id -> position index is kept alongside the
+    cache so lookups by ID don't scan the whole list.
+    
+    New records are appended as single JSON lines to a journal file
+    (<file>.journal) instead of rewriting the whole JSON file, and reads
+    merge them in. The journal's first line names the JSON file state it
+    extends (inode, mtime and size); every full rewrite replaces the JSON
+    file, which turns an existing journal stale, so records already folded
+    into the JSON file are never applied twice, even if the process dies
+    before the old journal is removed.
+    
+    Optionally a pickled copy of the parsed data is kept in a sidecar file
+    next to the JSON file, which stays the source of truth. The sidecar is
+    stamped with the JSON file's mtime and size and is only used while they
+    match, so a cold start can skip JSON parsing. Only point cache_path at a
+    location this application alone writes: loading a pickle runs code.
     """
     
     def __init__(
         self, 
         file_path: str, 
         from_dict: Callable[[dict], T],
-        to_dict: Callable[[T], dict]
+        to_dict: Callable[[T], dict],
+        cache_path: Optional[str] = None
     ):
         """
         Initialize the repository.
@@ -40,10 +84,27 @@ class JsonRepository(Generic[T]):
             file_path: Absolute or relative path to the JSON file
             from_dict: Function that converts a dict to domain model instance
             to_dict: Function that converts a domain model instance to dict
+            cache_path: Optional path of a pickle sidecar caching the parsed
+                file (disabled if None)
         """
         self.file_path = Path(file_path)
+        self.cache_path = Path(cache_path) if cache_path else None
         self.from_dict = from_dict
         self.to_dict = to_dict
+        self.journal_path = self.file_path.with_suffix(self.file_path.suffix + '.journal')
+        self._cache: Optional[List[dict]] = None
+        # (JSON file stamp, journal (mtime, size) or None) the cache was read at
+        self._cache_key: tuple = ()
+        # Whether the journal extends the current JSON file, how many records
+        # it holds and whether it ends in a partly written line
+        self._journal_live: bool = False
+        self._journal_count: int = 0
+        self._journal_torn: bool = False
+        self._id_index: Dict[str, int] = {}
+        self._generation: int = 0
+        # mtime of the last unparsable file version warned about
+        self._unparsable_mtime: int = -1
+        self._lock = threading.RLock()
         self._ensure_file_exists()
     
     def _ensure_file_exists(self):
@@ -53,18 +114,296 @@ class JsonRepository(Generic[T]):
             with open(self.file_path, 'w', encoding='utf-8') as f:
                 json.dump([], f)
     
-    def _read_all_raw(self) -> List[dict]:
-        """Read raw data from JSON file."""
+    def _read_all_raw(self, for_write: bool = False) -> List[dict]:
+        """
+        Read raw data from JSON file, reusing the cached parse when possible.
+        
+        The returned list is shared with the cache and must not be mutated;
+        write paths should copy it before making changes.
+        
+        Records appended to the journal are included after the JSON file's.
+        save() may append to the cached list in place, so callers iterating
+        it can see records added meanwhile.
+        
+        A missing or empty file reads as no records. A file that can't be
+        parsed reads as the last good parse (or no records if there is none)
+        with a warning, so pages keep working while it is fixed.
+        
+        Args:
+            for_write: If True, never fall back to the last good parse, since
+                writing it back would discard whatever is now in the file
+        
+        Raises:
+            DataFileError: If for_write is set and the file exists but can't
+                be parsed
+        """
+        with self._lock:
+            try:
+                stat = self.file_path.stat()
+            except FileNotFoundError:
+                return []
+            
+            stamp = self._file_stamp(stat)
+            key = (stamp, self._journal_stat())
+            if self._cache is not None and key == self._cache_key:
+                return self._cache
+            
+            mtime = stat.st_mtime_ns
+            data = self._load_from_disk()
+            if data is None:
+                # Unreadable file: nothing may be written on top of it, but
+                # readers get the last good parse and retry next time
+                if for_write:
+                    raise DataFileError(f"Data file {self.file_path} could not be parsed")
+                if mtime != self._unparsable_mtime:
+                    self._unparsable_mtime = mtime
+                    print(f"⚠️  Data file {self.file_path} could not be parsed; serving the last readable data")
+                return self._cache if self._cache is not None else []
+            
+            if key[1] is not None:
+                records = self._read_journal(stamp)
+                if records:
+                    data = data + records
+            else:
+                self._journal_live = False
+                self._journal_count = 0
+                self._journal_torn = False
+            self._set_cache(data, key)
+            return self._cache
+    
+    @staticmethod
+    def _file_stamp(stat: os.stat_result) -> tuple:
+        """Identify a version of the JSON file (os.replace() gives a new inode)."""
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    def _journal_stat(self) -> Optional[tuple]:
+        """Return the journal's (mtime, size), or None if there is no journal."""
+        try:
+            stat = os.stat(self.journal_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _read_journal(self, stamp: tuple) -> List[dict]:
+        """
+        Parse the journal's records if it extends the JSON file state `stamp`.
+        
+        A journal written against an older state of the JSON file is stale
+        (its records were folded in by the rewrite that replaced it) and reads
+        as no records. Lines that can't be parsed, e.g. a record cut short by
+        a crash, are skipped with a warning.
+        """
+        self._journal_live = False
+        self._journal_count = 0
+        self._journal_torn = False
+        try:
+            content = self.journal_path.read_bytes()
+        except FileNotFoundError:
+            return []
+        
+        lines = content.split(b'\n')
+        try:
+            header = self._parse_line(lines[0])
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get('base') != list(stamp):
+            return []
+        
+        records = []
+        skipped = 0
+        for line in lines[1:]:
+            if not line:
+                continue
+            try:
+                records.append(self._parse_line(line))
+            except ValueError:
+                skipped += 1
+        if skipped:
+            print(f"⚠️  Skipped {skipped} unreadable record(s) in {self.journal_path}")
+        
+        self._journal_live = True
+        self._journal_count = len(records)
+        self._journal_torn = not content.endswith(b'\n')
+        return records
+    
+    def _append_journal(self, item: dict) -> bool:
+        """
+        Append one record to the journal and to the cache.
+        
+        The caller holds the lock and has just read the data for writing.
+        
+        Returns:
+            False if the record must be saved by a full rewrite instead (no
+            JSON file yet, or the journal is due for compaction)
+        """
+        try:
+            stamp = self._file_stamp(self.file_path.stat())
+        except FileNotFoundError:
+            return False
+        if (
+            self._cache is None
+            or not self._cache_key
+            or stamp != self._cache_key[0]
+            or self._journal_count >= JOURNAL_COMPACT_RECORDS
+        ):
+            return False
+        
+        line = self._serialize_line(item)
+        if self._journal_live:
+            # Start a fresh line if the last append was cut short
+            payload = (b'\n' if self._journal_torn else b'') + line
+            expected_size = self._cache_key[1][1] + len(payload)
+            with open(self.journal_path, 'ab') as f:
+                f.write(payload)
+        else:
+            # Replaces any stale journal left by an interrupted compaction
+            payload = self._serialize_line({'base': list(stamp)}) + line
+            expected_size = len(payload)
+            tmp_path = self.journal_path.with_suffix(self.journal_path.suffix + '.tmp')
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, self.journal_path)
+        
+        self._journal_live = True
+        self._journal_count += 1
+        self._journal_torn = False
+        self._cache.append(item)
+        self._id_index.setdefault(item.get('id'), len(self._cache) - 1)
+        self._generation += 1
+        journal_stat = self._journal_stat()
+        if journal_stat is not None and journal_stat[1] == expected_size:
+            self._cache_key = (stamp, journal_stat)
+        else:
+            # Someone else appended too: reload on the next read
+            self._cache_key = ()
+        return True
+    
+    def _set_cache(self, data: List[dict], key: tuple):
+        """Replace the cached data and rebuild the id index."""
+        id_index: Dict[str, int] = {}
+        for i, item in enumerate(data):
+            # Keep the first occurrence, matching the old linear-scan semantics
+            id_index.setdefault(item.get('id'), i)
+        
+        self._cache = data
+        self._cache_key = key
+        self._id_index = id_index
+        self._generation += 1
+    
+    @property
+    def version(self) -> int:
+        """
+        Token that changes whenever the repository's data changes.
+        
+        Bumped on every write and every reload after the file changed on disk,
+        so callers can cache values derived from the data and rebuild them
+        only when the version moves.
+        """
+        with self._lock:
+            self._read_all_raw()
+            return self._generation
+    
+    def _load_from_disk(self) -> Optional[List[dict]]:
+        """Parse the JSON file from disk, bypassing the cache. Returns None if unparsable."""
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
+            with open(self.file_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                if not stat.st_size:
+                    # Empty file (e.g. truncated by hand): same as no records
+                    return []
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                if self.cache_path is not None:
+                    data = self._read_sidecar(stamp)
+                    if data is not None:
+                        return data
+                data = self._parse(f, stat.st_size)
+        except FileNotFoundError:
             return []
+        except ValueError:
+            # orjson.JSONDecodeError and json.JSONDecodeError both subclass ValueError
+            return None
+        
+        if self.cache_path is not None:
+            self._write_sidecar(stamp, data)
+        return data
+    
+    @staticmethod
+    def _parse(f, size: int) -> List[dict]:
+        """Parse an open JSON file (binary mode)."""
+        if orjson is not None:
+            if size < MMAP_THRESHOLD_BYTES:
+                return orjson.loads(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+        # json.loads accepts UTF-8 bytes directly, skipping the text-mode decode layer
+        return json.loads(f.read())
+    
+    def _read_sidecar(self, stamp: tuple) -> Optional[List[dict]]:
+        """Load the pickled data if the sidecar was written for this JSON file state."""
+        try:
+            with open(self.cache_path, 'rb') as f:
+                if pickle.load(f) != stamp:
+                    return None
+                return pickle.load(f)
+        except Exception:
+            # Missing, truncated or otherwise unusable sidecar: reparse the JSON
+            return None
+    
+    def _write_sidecar(self, stamp: tuple, data: List[dict]):
+        """Write the sidecar (stamp, then data) atomically; failures are ignored."""
+        tmp_path = self.cache_path.with_suffix(self.cache_path.suffix + '.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(stamp, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # The sidecar is only an accelerator; run without it
+            pass
+    
+    @staticmethod
+    def _parse_line(line: bytes):
+        """Parse one JSON value from a journal line."""
+        if orjson is not None:
+            return orjson.loads(line)
+        return json.loads(line)
+    
+    @staticmethod
+    def _serialize_line(item) -> bytes:
+        """Serialize a value to one line of compact UTF-8 JSON, newline included."""
+        if orjson is not None:
+            return orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        return (json.dumps(item, ensure_ascii=False) + '\n').encode('utf-8')
+    
+    @staticmethod
+    def _serialize(data) -> bytes:
+        """Serialize data to 2-space indented UTF-8 JSON bytes."""
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
     
     def _write_all_raw(self, data: List[dict]):
-        """Write raw data to JSON file."""
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """
+        Write raw data to JSON file and refresh the cache.
+        
+        The data is written to a temporary sibling file which then atomically
+        replaces the original, so concurrent readers see either the old or the
+        new contents, never a truncated file. `data` includes the journal's
+        records, so the journal is now stale and is removed.
+        """
+        with self._lock:
+            tmp_path = self.file_path.with_suffix(self.file_path.suffix + '.tmp')
+            tmp_path.write_bytes(self._serialize(data))
+            os.replace(tmp_path, self.file_path)
+            stamp = self._file_stamp(self.file_path.stat())
+            try:
+                os.remove(self.journal_path)
+            except FileNotFoundError:
+                pass
+            self._journal_live = False
+            self._journal_count = 0
+            self._journal_torn = False
+            self._set_cache(data, (stamp, None))
     
     def get_all(self) -> List[T]:
         """
@@ -74,7 +413,8 @@ class JsonRepository(Generic[T]):
             List of domain model instances
         """
         raw_data = self._read_all_raw()
-        return [self.from_dict(item) for item in raw_data]
+        from_dict = self.from_dict
+        return [from_dict(item) for item in raw_data]
     
     def get_by_id(self, entity_id: str) -> Optional[T]:
         """
@@ -86,25 +426,34 @@ class JsonRepository(Generic[T]):
         Returns:
             Domain model instance if found, None otherwise
         """
-        raw_data = self._read_all_raw()
-        for item in raw_data:
-            if item.get('id') == entity_id:
-                return self.from_dict(item)
-        return None
+        with self._lock:
+            raw_data = self._read_all_raw()
+            idx = self._id_index.get(entity_id)
+            item = raw_data[idx] if idx is not None else None
+        return self.from_dict(item) if item is not None else None
     
     def save(self, entity: T) -> T:
         """
         Save a new entity to the repository.
         
+        The record is appended to the journal, so the cost doesn't grow with
+        the number of stored records; every JOURNAL_COMPACT_RECORDS saves the
+        JSON file is rewritten with the journal folded in.
+        
         Args:
             entity: The domain model instance to save
         
         Returns:
             The saved entity
+        
+        Raises:
+            DataFileError: If the existing data file can't be parsed
         """
-        raw_data = self._read_all_raw()
-        raw_data.append(self.to_dict(entity))
-        self._write_all_raw(raw_data)
+        item = self.to_dict(entity)
+        with self._lock:
+            raw_data = self._read_all_raw(for_write=True)
+            if not self._append_journal(item):
+                self._write_all_raw(raw_data + [item])
         return entity
     
     def update(self, entity_id: str, entity: T) -> Optional[T]:
@@ -117,14 +466,72 @@ class JsonRepository(Generic[T]):
         
         Returns:
             The updated entity if found and updated, None otherwise
+        
+        Raises:
+            DataFileError: If the existing data file can't be parsed
         """
-        raw_data = self._read_all_raw()
-        for i, item in enumerate(raw_data):
-            if item.get('id') == entity_id:
-                raw_data[i] = self.to_dict(entity)
-                self._write_all_raw(raw_data)
-                return entity
-        return None
+        with self._lock:
+            raw_data = self._read_all_raw(for_write=True)
+            idx = self._id_index.get(entity_id)
+            if idx is None:
+                return None
+            
+            raw_data = list(raw_data)
+            raw_data[idx] = self.to_dict(entity)
+            self._write_all_raw(raw_data)
+        return entity
+    
+    def patch(self, entity_id: str, updater: Callable[[dict], None]) -> Optional[T]:
+        """
+        Modify a single stored record in place without a full entity round-trip.
+        
+        The record is looked up through the id index, mutated by the updater and
+        written back once, so small changes (e.g. campaign stats) don't require a
+        separate get_by_id() + update() pair.
+        
+        Args:
+            entity_id: The unique identifier of the entity to patch
+            updater: Function that mutates the raw record dict
+        
+        Returns:
+            The patched entity if found, None otherwise
+        
+        Raises:
+            DataFileError: If the existing data file can't be parsed
+        """
+        with self._lock:
+            raw_data = self._read_all_raw(for_write=True)
+            idx = self._id_index.get(entity_id)
+            if idx is None:
+                return None
+            
+            # Work on a copy so a failing updater can't corrupt the cache
+            item = copy.deepcopy(raw_data[idx])
+            updater(item)
+            
+            raw_data = list(raw_data)
+            raw_data[idx] = item
+            self._write_all_raw(raw_data)
+        return self.from_dict(item)
+    
+    def update_fields(self, entity_id: str, changes: Dict[str, Any]) -> Optional[T]:
+        """
+        Overwrite selected top-level fields of a stored record.
+        
+        Only the given fields are touched; the rest of the record is written
+        back as stored, without serializing the full entity.
+        
+        Args:
+            entity_id: The unique identifier of the entity to update
+            changes: Mapping of field name to new (JSON-serializable) value
+        
+        Returns:
+            The updated entity if found, None otherwise
+        
+        Raises:
+            DataFileError: If the existing data file can't be parsed
+        """
+        return self.patch(entity_id, lambda item: item.update(changes))
     
     def delete(self, entity_id: str) -> bool:
         """
@@ -135,15 +542,18 @@ class JsonRepository(Generic[T]):
         
         Returns:
             True if entity was found and deleted, False otherwise
-        """
-        raw_data = self._read_all_raw()
-        original_length = len(raw_data)
-        raw_data = [item for item in raw_data if item.get('id') != entity_id]
         
-        if len(raw_data) < original_length:
+        Raises:
+            DataFileError: If the existing data file can't be parsed
+        """
+        with self._lock:
+            raw_data = self._read_all_raw(for_write=True)
+            if entity_id not in self._id_index:
+                return False
+            
+            raw_data = [item for item in raw_data if item.get('id') != entity_id]
             self._write_all_raw(raw_data)
-            return True
-        return False
+        return True
     
     def find(self, predicate: Callable[[T], bool]) -> List[T]:
         """
@@ -162,6 +572,9 @@ class JsonRepository(Generic[T]):
         """
         Count total number of entities in the repository.
         
+        Served from the cached parse: the file is only re-read if it changed
+        since the last access, and no domain objects are constructed.
+        
         Returns:
             Total count of entities
         """
@@ -27,14 +27,36 @@ class AnalyticsService:
     - Depends on Repository Layer for data persistence
     """
     
-    def __init__(self, campaign_repository: JsonRepository):
+    def __init__(self, campaign_repository: JsonRepository, verbose: bool = False):
         """
         Initialize the analytics service with a campaign repository.
         
         Args:
             campaign_repository: Repository for campaign data access
+            verbose: If True, print a summary after each engagement simulation
         """
         self.campaign_repo = campaign_repository
+        self.verbose = verbose
+        # campaign_id -> mock device distribution, so repeated views stay stable
+        self._device_distribution_cache: Dict[str, Dict] = {}
+    
+    def _load_campaign(self, campaign_id: str, campaign: Optional[Campaign] = None) -> Campaign:
+        """
+        Return the given campaign, or load it from the repository.
+        
+        Lets callers that need several metrics for the same campaign load it
+        once and pass it to each method.
+        
+        Raises:
+            ValueError: If campaign not found
+        """
+        if campaign is not None and campaign.id == campaign_id:
+            return campaign
+        
+        campaign = self.campaign_repo.get_by_id(campaign_id)
+        if not campaign:
+            raise ValueError(f"Campaign with ID {campaign_id} not found.")
+        return campaign
     
     def simulate_engagement(self, campaign_id: str) -> Campaign:
         """
@@ -57,9 +79,7 @@ class AnalyticsService:
             ValueError: If campaign not found
         """
         # Load campaign
-        campaign = self.campaign_repo.get_by_id(campaign_id)
-        if not campaign:
-            raise ValueError(f"Campaign with ID {campaign_id} not found.")
+        campaign = self._load_campaign(campaign_id)
         
         # Only simulate if stats are all zero (just launched)
         if (campaign.stats.get('sent', 0) > 0 and 
@@ -69,31 +89,35 @@ class AnalyticsService:
             emails_sent = campaign.stats['sent']
             
             # Generate realistic open rate (25-65%)
-            open_rate = random.uniform(0.25, 0.65)
+            open_rate = 0.25 + random.random() * 0.40
             emails_opened = int(emails_sent * open_rate)
             
             # Generate realistic click rate (5-20% of opens)
-            click_rate_of_opens = random.uniform(0.05, 0.20)
+            click_rate_of_opens = 0.05 + random.random() * 0.15
             emails_clicked = int(emails_opened * click_rate_of_opens)
             
-            # Update campaign stats
-            campaign.stats['opened'] = emails_opened
-            campaign.stats['clicked'] = emails_clicked
-            
-            # Save updated campaign
-            self.campaign_repo.update(campaign_id, campaign)
+            # Persist the new stats with a single repository write
+            campaign = self.campaign_repo.patch(
+                campaign_id,
+                lambda d: d['stats'].update({'opened': emails_opened, 'clicked': emails_clicked})
+            )
             
-            print(f"📊 Analytics Simulation Complete:")
-            print(f"   Sent: {emails_sent}")
-            print(f"   Opened: {emails_opened} ({open_rate*100:.1f}% open rate)")
-            print(f"   Clicked: {emails_clicked} ({click_rate_of_opens*100:.1f}% click rate of opens)")
+            if self.verbose:
+                print(f"📊 Analytics Simulation Complete:")
+                print(f"   Sent: {emails_sent}")
+                print(f"   Opened: {emails_opened} ({open_rate*100:.1f}% open rate)")
+                print(f"   Clicked: {emails_clicked} ({click_rate_of_opens*100:.1f}% click rate of opens)")
         
         return campaign
     
-    def get_campaign_performance(self, campaign_id: str) -> Dict:
+    def get_campaign_performance(self, campaign_id: str, campaign: Optional[Campaign] = None) -> Dict:
         """
         Calculate comprehensive performance metrics for a campaign.
         
+        Args:
+            campaign_id: The ID of the campaign
+            campaign: Optional already-loaded campaign to avoid another lookup
+        
         Returns:
             Dictionary containing:
             - sent: Total emails sent
@@ -109,10 +133,8 @@ class AnalyticsService:
         Raises:
             ValueError: If campaign not found
         """
-        # Load campaign
-        campaign = self.campaign_repo.get_by_id(campaign_id)
-        if not campaign:
-            raise ValueError(f"Campaign with ID {campaign_id} not found.")
+        # Load campaign (reuse the caller's instance when provided)
+        campaign = self._load_campaign(campaign_id, campaign)
         
         # Extract stats
         sent = campaign.stats.get('sent', 0)
@@ -159,7 +181,7 @@ class AnalyticsService:
             'target_criteria': campaign.target_segment_criteria
         }
     
-    def get_geographic_distribution(self, campaign_id: str) -> Dict:
+    def get_geographic_distribution(self, campaign_id: str, campaign: Optional[Campaign] = None) -> Dict:
         """
         Get geographic distribution of campaign target audience.
         
@@ -168,13 +190,12 @@ class AnalyticsService:
         
         Args:
             campaign_id: The ID of the campaign
+            campaign: Optional already-loaded campaign to avoid another lookup
             
         Returns:
             Dictionary with city names as keys and counts as values
         """
-        campaign = self.campaign_repo.get_by_id(campaign_id)
-        if not campaign:
-            raise ValueError(f"Campaign with ID {campaign_id} not found.")
+        campaign = self._load_campaign(campaign_id, campaign)
         
         # If campaign targeted a specific city, return that
         if 'city' in campaign.target_segment_criteria:
@@ -195,35 +216,43 @@ class AnalyticsService:
             'Others': sent - int(sent * 0.40) - int(sent * 0.25) - int(sent * 0.15)
         }
     
-    def get_device_distribution(self, campaign_id: str) -> Dict:
+    def get_device_distribution(self, campaign_id: str, campaign: Optional[Campaign] = None) -> Dict:
         """
         Get mock device distribution for email opens.
         
         In production, this would come from email tracking pixels that detect
         user agents. For demo purposes, we generate realistic distributions.
+        The RNG is seeded with the campaign ID and the result is cached, so the
+        same campaign always shows the same distribution.
         
         Args:
             campaign_id: The ID of the campaign
+            campaign: Optional already-loaded campaign to avoid another lookup
             
         Returns:
             Dictionary with device types as keys and percentages as values
         """
-        campaign = self.campaign_repo.get_by_id(campaign_id)
-        if not campaign:
-            raise ValueError(f"Campaign with ID {campaign_id} not found.")
+        campaign = self._load_campaign(campaign_id, campaign)
         
         opened = campaign.stats.get('opened', 0)
         if opened == 0:
             return {'Mobile': 0, 'Desktop': 0, 'Tablet': 0}
         
+        cached = self._device_distribution_cache.get(campaign_id)
+        if cached is not None:
+            return dict(cached)
+        
         # Mock distribution based on industry averages
         # Source: Litmus Email Analytics (2024)
-        mobile_pct = random.uniform(50, 65)  # 50-65% mobile
-        tablet_pct = random.uniform(5, 10)   # 5-10% tablet
+        rng = random.Random(campaign_id)
+        mobile_pct = rng.uniform(50, 65)  # 50-65% mobile
+        tablet_pct = rng.uniform(5, 10)   # 5-10% tablet
         desktop_pct = 100 - mobile_pct - tablet_pct
         
-        return {
+        distribution = {
             'Mobile': round(mobile_pct, 1),
             'Desktop': round(desktop_pct, 1),
             'Tablet': round(tablet_pct, 1)
         }
+        self._device_distribution_cache[campaign_id] = distribution
+        return dict(distribution)
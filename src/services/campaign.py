@@ -2,12 +2,17 @@
 Campaign Management Service
 Business logic for creating and launching marketing campaigns.
 """
+import re
+import threading
+import time
 import uuid
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional, Dict, TYPE_CHECKING
+from typing import Callable, List, Optional, Dict, Set, Tuple, TYPE_CHECKING
 from src.models.campaign import Campaign
 from src.models.customer import Customer
-from src.repository.json_repo import JsonRepository
+from src.repository.campaign_repo import CampaignRepository
 from src.services.segmentation import SegmentationService
 from src.services.email_service import IEmailProvider, EmailServiceFactory
 
@@ -16,6 +21,33 @@ if TYPE_CHECKING:
     from src.services.analytics import AnalyticsService
 
 
+# Upper bound on concurrent email sends during a campaign launch
+MAX_SEND_WORKERS = 32
+
+# Upper bound on open SMTP connections, shared by all concurrent launches
+MAX_SMTP_CONNECTIONS = 8
+
+# Number of recipients a send worker takes from the queue at a time
+SEND_BATCH_SIZE = 16
+
+# Persist launch progress (sent/failed counts) every this many emails
+STATS_FLUSH_INTERVAL = 200
+
+# Number of queued campaign launches processed concurrently in the background
+LAUNCH_QUEUE_WORKERS = 4
+
+# Seconds without a heartbeat after which a 'Sending' campaign is considered
+# abandoned by the process that was sending it (heartbeats come 4x as often)
+LAUNCH_STALE_AFTER = 300
+
+# Placeholders supported in campaign content templates
+_PLACEHOLDER_PATTERN = re.compile(r'\{(name|email|city)\}')
+
+# Bound once to skip the attribute lookups on every campaign created
+_now = datetime.now
+_uuid4 = uuid.uuid4
+
+
 class CampaignService:
     """
     Service responsible for campaign management and execution.
@@ -30,9 +62,16 @@ class CampaignService:
     
     def __init__(
         self,
-        campaign_repository: JsonRepository[Campaign],
+        campaign_repository: CampaignRepository,
         segmentation_service: SegmentationService,
-        analytics_service: Optional['AnalyticsService'] = None
+        analytics_service: Optional['AnalyticsService'] = None,
+        max_send_workers: int = MAX_SEND_WORKERS,
+        verbose_mock_email: bool = False,
+        launch_queue_workers: int = LAUNCH_QUEUE_WORKERS,
+        send_batch_size: int = SEND_BATCH_SIZE,
+        stats_flush_interval: int = STATS_FLUSH_INTERVAL,
+        launch_stale_after: float = LAUNCH_STALE_AFTER,
+        max_smtp_connections: int = MAX_SMTP_CONNECTIONS
     ):
         """
         Initialize the campaign service.
@@ -41,10 +80,122 @@ class CampaignService:
             campaign_repository: Repository for campaign data access
             segmentation_service: Service for customer segmentation
             analytics_service: Optional analytics service for engagement simulation
+            max_send_workers: Maximum number of emails sent concurrently on launch
+            verbose_mock_email: If True, simulated launches print every email
+            launch_queue_workers: Number of queued launches run concurrently
+            send_batch_size: Number of recipients sent per worker task
+            stats_flush_interval: Emails sent between progress writes
+            launch_stale_after: Seconds without a heartbeat before another
+                process's 'Sending' campaign counts as interrupted
+            max_smtp_connections: Maximum number of SMTP connections open at
+                once across all launches of this service
         """
         self.campaign_repository = campaign_repository
         self.segmentation_service = segmentation_service
         self.analytics_service = analytics_service
+        self.max_send_workers = max_send_workers
+        self.verbose_mock_email = verbose_mock_email
+        self.launch_queue_workers = launch_queue_workers
+        self.send_batch_size = max(1, send_batch_size)
+        self.stats_flush_interval = stats_flush_interval
+        self.launch_stale_after = launch_stale_after
+        self.max_smtp_connections = max(1, max_smtp_connections)
+        # Shared by every launch's SMTP provider, so concurrent launches
+        # together never hold more than max_smtp_connections sessions
+        self._smtp_slots = threading.BoundedSemaphore(self.max_smtp_connections)
+        
+        # Background launch queue, started on first use
+        self._launch_executor: Optional[ThreadPoolExecutor] = None
+        self._launch_lock = threading.RLock()
+        
+        # Identifies this service's launches in the campaigns' launch leases;
+        # the ids of its queued/running launches get a heartbeat
+        self._owner_id = _uuid4().hex
+        self._active_launches: Set[str] = set()
+        
+        # Ids of the campaigns being sent right now (guarded by _launch_lock),
+        # so the same campaign is never sent by two launches at once
+        self._sending_ids: Set[str] = set()
+        
+        # Secondary index: status -> campaign ids (dict used as an ordered set),
+        # valid for the repository version it was built from
+        self._by_status: Optional[Dict[str, Dict[str, None]]] = None
+        self._by_status_version: int = -1
+        self._status_lock = threading.Lock()
+    
+    def recover_interrupted_launches(self) -> int:
+        """
+        Move campaigns whose launch was abandoned back to 'Draft'.
+        
+        A 'Sending' campaign carries a lease naming the process running its
+        launch, which renews the lease's heartbeat while the launch is queued
+        or running. Campaigns whose heartbeat is older than launch_stale_after
+        (or that have no lease) have no live launch behind it, e.g. the
+        process exited mid-send; without this they would stay stuck, since
+        queue_launch() and refresh_segment() both refuse a 'Sending'
+        campaign. Launches of other live processes are left alone.
+        
+        The sent/failed counts and the last recipient flushed by the
+        interrupted launch are kept, so launching the campaign again resumes
+        after that recipient.
+        
+        Meant to be called once at application startup.
+        
+        Returns:
+            Number of campaigns moved back to 'Draft'
+        
+        Raises:
+            DataFileError: If the campaigns file can't be parsed
+        """
+        now = time.time()
+        recovered = 0
+        for campaign in self._get_campaigns_with_status('Sending'):
+            lease = campaign.launch_lease or {}
+            if lease.get('owner') == self._owner_id:
+                continue
+            heartbeat = lease.get('heartbeat')
+            if heartbeat is not None and now - heartbeat < self.launch_stale_after:
+                continue
+            self._restore_status(campaign.id, 'Draft')
+            recovered += 1
+            print(f"⚠️  Launch of campaign '{campaign.title}' was interrupted; moved back to Draft")
+        return recovered
+    
+    def _get_status_index(self) -> Dict[str, Dict[str, None]]:
+        """Return the status index, rebuilding it if campaign data changed."""
+        with self._status_lock:
+            version = self.campaign_repository.version
+            if self._by_status is None or version != self._by_status_version:
+                by_status: Dict[str, Dict[str, None]] = defaultdict(dict)
+                for campaign in self.campaign_repository.get_all():
+                    by_status[campaign.status][campaign.id] = None
+                self._by_status = by_status
+                self._by_status_version = version
+            return self._by_status
+    
+    def _write_with_status(self, campaign: Campaign, old_status: Optional[str], write) -> None:
+        """
+        Persist a campaign via write() and keep the status index in step.
+        
+        If the index was current before the write it is patched in place (O(1))
+        instead of being rebuilt from the repository on the next lookup.
+        """
+        with self._status_lock:
+            was_current = (
+                self._by_status is not None
+                and self._by_status_version == self.campaign_repository.version
+            )
+            write()
+            if was_current:
+                if old_status is not None and old_status != campaign.status:
+                    self._by_status[old_status].pop(campaign.id, None)
+                self._by_status[campaign.status][campaign.id] = None
+                self._by_status_version = self.campaign_repository.version
+    
+    @staticmethod
+    def _new_id() -> str:
+        """Generate a new campaign id (UUID4 as a 32-character hex string)."""
+        return _uuid4().hex
     
     def create_campaign(
         self,
@@ -78,17 +229,31 @@ class CampaignService:
         
         # Create campaign object
         campaign = Campaign(
-            id=str(uuid.uuid4()),
+            id=self._new_id(),
             title=title.strip(),
             content_template=content_template.strip(),
             target_segment_criteria=target_segment_criteria,
             status='Draft',
-            created_at=datetime.now(),
+            created_at=_now(),
             stats={'sent': 0, 'opened': 0, 'clicked': 0}
         )
         
+        member_ids = [
+            customer.id
+            for customer in self.segmentation_service.filter_customers(target_segment_criteria)
+        ]
+        
         # Save to repository
-        self.campaign_repository.save(campaign)
+        self._write_with_status(campaign, None, lambda: self.campaign_repository.save(campaign))
+        
+        # Snapshot the segment members so detail pages and the launch read
+        # them back instead of re-running the filter. Written only once the
+        # campaign exists, so a failed save leaves no orphaned segment file;
+        # if this write fails the campaign falls back to its criteria.
+        try:
+            self.campaign_repository.save_segment(campaign.id, member_ids)
+        except OSError as e:
+            print(f"⚠️  Could not save the segment of campaign '{campaign.title}': {str(e)}")
         
         print(f"✅ Campaign '{title}' created successfully (ID: {campaign.id})")
         return campaign
@@ -113,9 +278,23 @@ class CampaignService:
             Dictionary containing launch results and statistics
         
         Raises:
-            ValueError: If campaign not found or already sent
+            ValueError: If campaign not found, already sent or being sent
         """
-        # Load campaign
+        with self._launch_lock:
+            if self.campaign_repository.get_by_id(campaign_id) is None:
+                raise ValueError(f"Campaign with ID {campaign_id} not found")
+            if campaign_id in self._sending_ids:
+                raise ValueError("Campaign is already being sent")
+            self._sending_ids.add(campaign_id)
+        try:
+            return self._launch_campaign_locked(campaign_id, use_real_email)
+        finally:
+            with self._launch_lock:
+                self._sending_ids.discard(campaign_id)
+    
+    def _launch_campaign_locked(self, campaign_id: str, use_real_email: bool) -> Dict:
+        """Body of launch_campaign(); the caller has marked the campaign as being sent."""
+        # Load campaign (after marking it, so a finished launch is seen)
         campaign = self.campaign_repository.get_by_id(campaign_id)
         if not campaign:
             raise ValueError(f"Campaign with ID {campaign_id} not found")
@@ -126,13 +305,29 @@ class CampaignService:
         print(f"\n🚀 Launching campaign: {campaign.title}")
         print(f"   Campaign ID: {campaign.id}")
         
-        # Get target audience using segmentation service
+        # Get target audience (the saved segment, or the criteria for campaigns without one)
         print(f"   Retrieving target audience with criteria: {campaign.target_segment_criteria}")
-        target_customers = self.segmentation_service.filter_customers(
-            campaign.target_segment_criteria
-        )
-        
-        if not target_customers:
+        member_ids = self._launch_member_ids(campaign)
+        
+        # A relaunch after an interrupted launch resumes after the last
+        # recipient its progress writes recorded. The member list is the
+        # saved segment, which can't change while a launch is unfinished, so
+        # the cursor's position in it is stable even if customers were
+        # deleted since. Only emails sent after the last progress write
+        # (fewer than stats_flush_interval) go out again.
+        start = 0
+        emails_sent = emails_failed = 0
+        if campaign.launch_cursor is not None:
+            try:
+                start = member_ids.index(campaign.launch_cursor) + 1
+            except ValueError:
+                raise ValueError("Cannot resume the interrupted launch: its last recipient is not in the campaign's segment")
+            emails_sent = campaign.stats.get('sent', 0)
+            emails_failed = campaign.stats.get('failed', 0)
+        pending_customers = self.segmentation_service.get_customers_by_ids(member_ids[start:])
+        audience_size = emails_sent + emails_failed + len(pending_customers)
+        
+        if not audience_size:
             print("⚠️  No customers match the target criteria. Campaign aborted.")
             return {
                 'success': False,
@@ -141,42 +336,85 @@ class CampaignService:
                 'target_audience_size': 0
             }
         
-        print(f"   Target audience size: {len(target_customers)} customers")
+        print(f"   Target audience size: {audience_size} customers")
+        if campaign.launch_cursor is not None:
+            print(f"   Resuming interrupted launch: {emails_sent + emails_failed} recipients already processed")
         
         # STRATEGY PATTERN: Select email provider based on flag
-        email_provider: IEmailProvider = EmailServiceFactory.create_provider(use_real_email)
+        email_provider: IEmailProvider = EmailServiceFactory.create_provider(
+            use_real_email,
+            verbose=self.verbose_mock_email,
+            connection_slots=self._smtp_slots
+        )
         
-        # Send emails to each customer in target segment
-        emails_sent = 0
-        emails_failed = 0
+        # Parse the template once; each recipient then only fills in the fields
+        render = self._make_renderer(self._compile_template(campaign.content_template))
         
-        print(f"\n📨 Sending emails...")
-        for customer in target_customers:
-            # Personalize content by replacing placeholders
-            personalized_content = self._personalize_content(
-                campaign.content_template,
-                customer
-            )
-            
-            # Use the strategy to send email
-            success = email_provider.send(
-                to_email=customer.email,
-                subject=campaign.title,
-                body=personalized_content
-            )
+        # Send emails to each customer in target segment. Sending is I/O-bound
+        # (SMTP round-trips), so sends are overlapped on a thread pool.
+        def send_batch(batch: List[Customer]) -> List[bool]:
+            # Personalize content by filling in placeholders
+            messages = [(customer.email, render(customer)) for customer in batch]
             
-            if success:
-                emails_sent += 1
-            else:
-                emails_failed += 1
+            # Use the strategy to send the batch (shared subject/headers)
+            try:
+                return email_provider.send_many(campaign.title, messages)
+            except Exception:
+                return [False] * len(batch)
+        
+        # Workers pull small batches off the executor's queue and push them
+        # through their own (reused) connection, which keeps per-task overhead
+        # low while still spreading the audience across all workers.
+        batch_size = self.send_batch_size
+        batches = [
+            pending_customers[i:i + batch_size]
+            for i in range(0, len(pending_customers), batch_size)
+        ]
+        
+        print(f"\n📨 Sending emails...")
+        unflushed = 0
+        max_workers = max(1, min(self.max_send_workers, len(batches)))
+        if use_real_email:
+            # A worker sends over one connection at a time; more workers
+            # than connection slots would only wait for one
+            max_workers = min(max_workers, self.max_smtp_connections)
+        # The provider context keeps connections open for reuse for the whole campaign
+        with email_provider, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Results arrive in batch order; progress is persisted periodically
+            # so the campaign page can show it while the launch runs, along
+            # with the last recipient handled so a relaunch can resume there
+            for batch, batch_results in zip(batches, executor.map(send_batch, batches)):
+                sent = sum(1 for success in batch_results if success)
+                emails_sent += sent
+                emails_failed += len(batch_results) - sent
+                unflushed += len(batch_results)
+                done = emails_sent + emails_failed
+                if self.stats_flush_interval and unflushed >= self.stats_flush_interval and done < audience_size:
+                    self._flush_progress(campaign, emails_sent, emails_failed, batch[-1].id)
+                    unflushed = 0
         
         # Update campaign statistics
+        previous_status = campaign.status
         campaign.stats['sent'] = emails_sent
         campaign.stats['failed'] = emails_failed
         campaign.status = 'Sent'
-        
-        # Save updated campaign (before analytics simulation)
-        self.campaign_repository.update(campaign.id, campaign)
+        campaign.launch_lease = None
+        campaign.launch_cursor = None
+        
+        # Save only the changed fields (before analytics simulation)
+        self._write_with_status(
+            campaign,
+            previous_status,
+            lambda: self.campaign_repository.update_fields(
+                campaign.id,
+                {
+                    'stats': dict(campaign.stats),
+                    'status': campaign.status,
+                    'launch_lease': None,
+                    'launch_cursor': None
+                }
+            )
+        )
         
         # PHASE 4: Trigger analytics simulation immediately after launch
         # This ensures the dashboard has data to display
@@ -193,31 +431,315 @@ class CampaignService:
             'message': 'Campaign launched successfully',
             'emails_sent': emails_sent,
             'emails_failed': emails_failed,
-            'target_audience_size': len(target_customers),
+            'target_audience_size': audience_size,
             'campaign_id': campaign.id
         }
     
-    def _personalize_content(self, template: str, customer: Customer) -> str:
+    def _flush_progress(self, campaign: Campaign, emails_sent: int, emails_failed: int, cursor: str) -> None:
+        """Persist the sent/failed counts and last handled recipient of a running launch."""
+        stats = {**campaign.stats, 'sent': emails_sent, 'failed': emails_failed}
+        self._write_with_status(
+            campaign,
+            campaign.status,
+            lambda: self.campaign_repository.update_fields(
+                campaign.id,
+                {'stats': stats, 'launch_cursor': cursor}
+            )
+        )
+    
+    def _launch_member_ids(self, campaign: Campaign) -> List[str]:
+        """
+        Return the member IDs a launch sends to, in send order.
+        
+        Campaigns without a saved segment get one from their criteria first,
+        so an interrupted launch resumes against the same list.
+        
+        Raises:
+            ValueError: If an unfinished launch's segment is missing
+        """
+        member_ids = self.campaign_repository.get_segment(campaign.id)
+        if member_ids is not None:
+            return member_ids
+        if campaign.launch_cursor is not None:
+            raise ValueError("Cannot resume the interrupted launch: the campaign's segment is missing")
+        
+        member_ids = [
+            customer.id
+            for customer in self.segmentation_service.filter_customers(campaign.target_segment_criteria)
+        ]
+        self.campaign_repository.save_segment(campaign.id, member_ids)
+        return member_ids
+    
+    def get_target_customers(self, campaign: Campaign, limit: Optional[int] = None) -> List[Customer]:
+        """
+        Retrieve the customers a campaign targets.
+        
+        Uses the member IDs saved with the campaign; campaigns created before
+        segments were saved fall back to filtering by their criteria.
+        
+        Args:
+            campaign: Campaign whose audience to retrieve
+            limit: Maximum number of customers to return (None for all)
+        
+        Returns:
+            List of target customers
+        """
+        member_ids = self.campaign_repository.get_segment(campaign.id)
+        if member_ids is not None:
+            return self.segmentation_service.get_customers_by_ids(member_ids, limit=limit)
+        if limit is None:
+            return self.segmentation_service.filter_customers(campaign.target_segment_criteria)
+        return list(self.segmentation_service.filter_customers_iter(
+            campaign.target_segment_criteria,
+            limit=limit
+        ))
+    
+    def get_target_audience_size(self, campaign: Campaign) -> int:
+        """
+        Return the number of customers a campaign targets.
+        
+        Args:
+            campaign: Campaign whose audience to count
+        
+        Returns:
+            Number of saved segment members that still exist (the customers
+            get_target_customers() returns), or of the criteria's current
+            matches
+        """
+        member_ids = self.campaign_repository.get_segment(campaign.id)
+        if member_ids is not None:
+            return self.segmentation_service.count_customers_by_ids(member_ids)
+        return self.segmentation_service.get_audience_size(campaign.target_segment_criteria)
+    
+    def refresh_segment(self, campaign_id: str) -> int:
+        """
+        Recompute a draft campaign's saved segment from its criteria.
+        
+        Used after customer data changes, since the saved member IDs are a
+        snapshot taken when the campaign was created.
+        
+        Args:
+            campaign_id: ID of the campaign to refresh
+        
+        Returns:
+            Number of customers in the refreshed segment
+        
+        Raises:
+            ValueError: If campaign not found, no longer a draft or partly
+                sent by an interrupted launch (whose resume position is in
+                the saved segment)
+        """
+        with self._launch_lock:
+            campaign = self.campaign_repository.get_by_id(campaign_id)
+            if not campaign:
+                raise ValueError(f"Campaign with ID {campaign_id} not found")
+            
+            if campaign.status != 'Draft':
+                raise ValueError("Only draft campaigns can have their segment refreshed")
+            
+            if campaign.launch_cursor is not None:
+                raise ValueError("Campaign was partly sent; launch it again to finish sending")
+            
+            member_ids = [
+                customer.id
+                for customer in self.segmentation_service.filter_customers(campaign.target_segment_criteria)
+            ]
+            self.campaign_repository.save_segment(campaign_id, member_ids)
+        
+        print(f"🔄 Segment of campaign '{campaign.title}' refreshed: {len(member_ids)} customers")
+        return len(member_ids)
+    
+    def queue_launch(self, campaign_id: str, use_real_email: bool = False) -> Future:
         """
-        Personalize email content by replacing placeholders with customer data.
+        Queue a campaign launch to run in the background.
+        
+        The campaign is validated and marked 'Sending' immediately, then
+        launch_campaign() runs on the launch queue. When it finishes the
+        campaign is 'Sent' with its final stats, or back to 'Draft' if the
+        launch could not go ahead (e.g. no matching customers).
+        
+        Args:
+            campaign_id: ID of the campaign to launch
+            use_real_email: If True, uses SMTP; if False, uses Mock provider
         
-        Supported placeholders:
-        - {name}: Customer name
-        - {email}: Customer email
-        - {city}: Customer city
+        Returns:
+            Future resolving to the launch_campaign() result dictionary
+        
+        Raises:
+            ValueError: If campaign not found, already sent or already queued
+        """
+        with self._launch_lock:
+            campaign = self.campaign_repository.get_by_id(campaign_id)
+            if not campaign:
+                raise ValueError(f"Campaign with ID {campaign_id} not found")
+            
+            if campaign.status == 'Sent':
+                raise ValueError("Campaign has already been sent")
+            
+            if campaign.status == 'Sending' or campaign_id in self._sending_ids:
+                raise ValueError("Campaign is already being sent")
+            
+            previous_status = campaign.status
+            campaign.status = 'Sending'
+            campaign.launch_lease = self._new_lease()
+            self._write_with_status(
+                campaign,
+                previous_status,
+                lambda: self.campaign_repository.update_fields(
+                    campaign.id,
+                    {'status': 'Sending', 'launch_lease': campaign.launch_lease}
+                )
+            )
+            self._active_launches.add(campaign_id)
+            
+            if self._launch_executor is None:
+                self._launch_executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.launch_queue_workers),
+                    thread_name_prefix='campaign-launch'
+                )
+                threading.Thread(
+                    target=self._heartbeat_loop,
+                    name='campaign-launch-heartbeat',
+                    daemon=True
+                ).start()
+            return self._launch_executor.submit(
+                self._run_queued_launch, campaign_id, use_real_email, previous_status
+            )
+    
+    def _run_queued_launch(self, campaign_id: str, use_real_email: bool, previous_status: str) -> Dict:
+        """Run a queued launch, restoring the previous status if it doesn't complete."""
+        try:
+            result = self.launch_campaign(campaign_id, use_real_email)
+        except Exception as e:
+            print(f"❌ Queued launch of campaign {campaign_id} failed: {str(e)}")
+            result = {'success': False, 'message': str(e), 'emails_sent': 0}
+        
+        try:
+            if not result['success']:
+                self._restore_status(campaign_id, previous_status)
+        finally:
+            with self._launch_lock:
+                self._active_launches.discard(campaign_id)
+        return result
+    
+    def _new_lease(self) -> Dict:
+        """Build a launch lease owned by this service, with a fresh heartbeat."""
+        return {'owner': self._owner_id, 'heartbeat': time.time()}
+    
+    def _heartbeat_loop(self) -> None:
+        """Renew the leases of this service's queued and running launches, forever."""
+        interval = max(1.0, self.launch_stale_after / 4)
+        while True:
+            time.sleep(interval)
+            with self._launch_lock:
+                campaign_ids = list(self._active_launches)
+            if not campaign_ids:
+                continue
+            try:
+                self._renew_leases(campaign_ids)
+            except Exception as e:
+                print(f"⚠️  Could not renew launch heartbeats: {str(e)}")
+    
+    def _renew_leases(self, campaign_ids: List[str]) -> None:
+        """Write a fresh heartbeat into the lease of each campaign still 'Sending'."""
+        lease = self._new_lease()
+        
+        def renew(item: Dict) -> None:
+            if item.get('status') == 'Sending':
+                item['launch_lease'] = dict(lease)
+        
+        with self._status_lock:
+            was_current = (
+                self._by_status is not None
+                and self._by_status_version == self.campaign_repository.version
+            )
+            for campaign_id in campaign_ids:
+                self.campaign_repository.patch(campaign_id, renew)
+            # Statuses are unchanged, so a current index stays current
+            if was_current:
+                self._by_status_version = self.campaign_repository.version
+    
+    def _restore_status(self, campaign_id: str, status: str) -> None:
+        """Move a campaign that is still 'Sending' back to the given status."""
+        campaign = self.campaign_repository.get_by_id(campaign_id)
+        if campaign and campaign.status == 'Sending':
+            campaign.status = status
+            campaign.launch_lease = None
+            self._write_with_status(
+                campaign,
+                'Sending',
+                lambda: self.campaign_repository.update_fields(
+                    campaign_id,
+                    {'status': status, 'launch_lease': None}
+                )
+            )
+    
+    @staticmethod
+    def _compile_template(template: str) -> Tuple[List[str], List[str]]:
+        """
+        Split a content template into literal segments and placeholder fields.
         
         Args:
             template: Content template with placeholders
+        
+        Returns:
+            (literals, fields) where literals has exactly one more element than
+            fields and the template is literals[0] + field[0] + literals[1] + ...
+        """
+        parts = _PLACEHOLDER_PATTERN.split(template)
+        return parts[0::2], parts[1::2]
+    
+    @classmethod
+    def _make_renderer(cls, compiled: Tuple[List[str], List[str]]) -> Callable[[Customer], str]:
+        """
+        Build a per-customer render function for a compiled template.
+        
+        Templates that reference fewer than all three placeholder fields (e.g.
+        only {city}) produce many identical bodies, so their output is memoized
+        keyed on just the referenced field values.
+        
+        Args:
+            compiled: Output of _compile_template()
+        
+        Returns:
+            Function mapping a Customer to its personalized content
+        """
+        used_fields = tuple(sorted(set(compiled[1])))
+        if len(used_fields) >= 3:
+            return lambda customer: cls._render_template(compiled, customer)
+        
+        rendered: Dict[tuple, str] = {}
+        
+        def render(customer: Customer) -> str:
+            key = tuple(getattr(customer, f) for f in used_fields)
+            content = rendered.get(key)
+            if content is None:
+                content = rendered[key] = cls._render_template(compiled, customer)
+            return content
+        
+        return render
+    
+    @staticmethod
+    def _render_template(compiled: Tuple[List[str], List[str]], customer: Customer) -> str:
+        """
+        Render a compiled template for one customer.
+        
+        Args:
+            compiled: Output of _compile_template()
             customer: Customer object with data
         
         Returns:
             Personalized content string
         """
-        personalized = template
-        personalized = personalized.replace('{name}', customer.name)
-        personalized = personalized.replace('{email}', customer.email)
-        personalized = personalized.replace('{city}', customer.city)
-        return personalized
+        literals, fields = compiled
+        if not fields:
+            return literals[0]
+        
+        pieces = [literals[0]]
+        for field_name, literal in zip(fields, literals[1:]):
+            pieces.append(getattr(customer, field_name))
+            pieces.append(literal)
+        return ''.join(pieces)
     
     def get_all_campaigns(self) -> List[Campaign]:
         """
@@ -228,6 +750,51 @@ class CampaignService:
         """
         return self.campaign_repository.get_all()
     
+    def get_campaigns_newest_first(self) -> List[Campaign]:
+        """
+        Retrieve all campaigns ordered by creation time, most recent first.
+        
+        The order is maintained by the repository, so this doesn't sort on
+        every call. Callers must not mutate the returned list.
+        
+        Returns:
+            List of all Campaign objects, newest first
+        """
+        return self.campaign_repository.get_all_sorted_by_created_desc()
+    
+    def get_page(self, after: Optional[str] = None, limit: int = 50) -> Dict:
+        """
+        Retrieve one page of campaigns, newest first, for the JSON API.
+        
+        Args:
+            after: ID of the last campaign of the previous page (None for the
+                first page)
+            limit: Maximum number of campaigns on the page
+        
+        Returns:
+            Dictionary with the serialized 'campaigns' and 'next_after', the
+            cursor for the following page (None on the last page)
+        
+        Raises:
+            ValueError: If `after` doesn't identify an existing campaign
+        """
+        campaigns, has_more = self.campaign_repository.get_page_sorted_by_created_desc(after, limit)
+        return {
+            'campaigns': [campaign.to_dict() for campaign in campaigns],
+            'next_after': campaigns[-1].id if has_more and campaigns else None
+        }
+    
+    def count_campaigns_by_status(self) -> Dict[str, int]:
+        """
+        Count campaigns per status using the status index.
+        
+        Returns:
+            Dictionary mapping status (e.g. 'Draft', 'Sent') to campaign count
+        """
+        by_status = self._get_status_index()
+        with self._status_lock:
+            return {status: len(ids) for status, ids in by_status.items() if ids}
+    
     def get_campaign_by_id(self, campaign_id: str) -> Optional[Campaign]:
         """
         Retrieve a campaign by ID.
@@ -247,7 +814,7 @@ class CampaignService:
         Returns:
             List of draft Campaign objects
         """
-        return self.campaign_repository.find(lambda c: c.status == 'Draft')
+        return self._get_campaigns_with_status('Draft')
     
     def get_sent_campaigns(self) -> List[Campaign]:
         """
@@ -256,4 +823,10 @@ class CampaignService:
         Returns:
             List of sent Campaign objects
         """
-        return self.campaign_repository.find(lambda c: c.status == 'Sent')
+        return self._get_campaigns_with_status('Sent')
+    
+    def _get_campaigns_with_status(self, status: str) -> List[Campaign]:
+        """Fetch campaigns with the given status through the status index."""
+        campaign_ids = list(self._get_status_index().get(status, ()))
+        campaigns = (self.campaign_repository.get_by_id(i) for i in campaign_ids)
+        return [c for c in campaigns if c is not None]
@@ -4,9 +4,10 @@ Provides flexible email sending mechanisms through interchangeable strategies.
 """
 from abc import ABC, abstractmethod
 import smtplib
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
 import os
 
 
@@ -35,6 +36,48 @@ class IEmailProvider(ABC):
             True if email was sent successfully, False otherwise
         """
         pass
+    
+    def send_many(self, subject: str, messages: Iterable[Tuple[str, str]]) -> List[bool]:
+        """
+        Send one email per (to_email, body) pair, all with the same subject.
+        
+        Default implementation calls send() for each message; providers that
+        can share work between messages (e.g. headers) override this.
+        
+        Args:
+            subject: Email subject line shared by all messages
+            messages: Iterable of (to_email, body) pairs
+        
+        Returns:
+            List of per-message results, in input order
+        """
+        results = []
+        for to_email, body in messages:
+            try:
+                results.append(self.send(to_email=to_email, subject=subject, body=body))
+            except Exception:
+                results.append(False)
+        return results
+    
+    def open(self):
+        """
+        Prepare the provider for a series of sends (e.g. open connections).
+        
+        Default implementation does nothing; providers with expensive setup
+        override this so it happens once per campaign instead of once per email.
+        """
+        pass
+    
+    def close(self):
+        """Release any resources acquired by open(). Default does nothing."""
+        pass
+    
+    def __enter__(self) -> 'IEmailProvider':
+        self.open()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 class MockEmailProvider(IEmailProvider):
@@ -49,11 +92,30 @@ class MockEmailProvider(IEmailProvider):
     - Development and testing
     - Bulk campaign simulations
     - Demonstrations without email infrastructure
+    
+    By default nothing is printed per email, since console output dominates
+    the cost of simulating a large campaign; only a counter is kept.
     """
     
+    def __init__(self, verbose: bool = False):
+        """
+        Initialize the mock provider.
+        
+        Args:
+            verbose: If True, log every simulated email to the console
+        """
+        self.verbose = verbose
+        self._sent_count = 0
+        self._count_lock = threading.Lock()
+    
+    @property
+    def sent_count(self) -> int:
+        """Number of emails simulated by this provider."""
+        return self._sent_count
+    
     def send(self, to_email: str, subject: str, body: str) -> bool:
         """
-        Simulate sending an email by logging to console.
+        Simulate sending an email.
         
         Args:
             to_email: Recipient email address
@@ -63,9 +125,12 @@ class MockEmailProvider(IEmailProvider):
         Returns:
             Always returns True (simulated success)
         """
-        print(f"📧 [MOCK] Sending email to: {to_email}")
-        print(f"   Subject: {subject}")
-        print(f"   Body Preview: {body[:50]}...")
+        with self._count_lock:
+            self._sent_count += 1
+        if self.verbose:
+            print(f"📧 [MOCK] Sending email to: {to_email}")
+            print(f"   Subject: {subject}")
+            print(f"   Body Preview: {body[:50]}...")
         return True
 
 
@@ -84,6 +149,17 @@ class SmtpEmailProvider(IEmailProvider):
     
     Note: For Gmail, you may need to use an "App Password" instead of
     your regular password. Enable 2FA and generate an app password.
+    
+    Used as a context manager (``with provider:``), connections are kept in a
+    pool and reused for every email until the block exits, so the connection,
+    STARTTLS handshake and login happen once per connection rather than once
+    per email. A sending thread borrows a connection for one message at a
+    time. Outside of the block, each send() connects on its own.
+    
+    Providers given the same connection_slots semaphore share its limit: each
+    open connection holds a slot until it is closed. Because a waiting thread
+    also takes connections its own provider returns to the pool, a launch that
+    holds any connection keeps sending while other launches wait for slots.
     """
     
     def __init__(
@@ -91,7 +167,8 @@ class SmtpEmailProvider(IEmailProvider):
         smtp_host: Optional[str] = None,
         smtp_port: Optional[int] = None,
         smtp_user: Optional[str] = None,
-        smtp_password: Optional[str] = None
+        smtp_password: Optional[str] = None,
+        connection_slots: Optional[threading.Semaphore] = None
     ):
         """
         Initialize SMTP provider with configuration.
@@ -101,15 +178,136 @@ class SmtpEmailProvider(IEmailProvider):
             smtp_port: SMTP server port (falls back to env var)
             smtp_user: SMTP username (falls back to env var)
             smtp_password: SMTP password (falls back to env var)
+            connection_slots: Optional semaphore bounding the number of open
+                connections, shared between providers (unbounded if None)
         """
         self.smtp_host = smtp_host or os.getenv('SMTP_HOST', 'smtp.gmail.com')
         self.smtp_port = smtp_port or int(os.getenv('SMTP_PORT', '587'))
         self.smtp_user = smtp_user or os.getenv('SMTP_USER', '')
         self.smtp_password = smtp_password or os.getenv('SMTP_PASSWORD', '')
+        self._slots = connection_slots
+        
+        # Pooled connections while open: every open one, and the idle ones
+        self._is_open = False
+        self._connections = []
+        self._idle = []
+        self._pool = threading.Condition()
         
         if not self.smtp_user or not self.smtp_password:
             print("⚠️  Warning: SMTP credentials not configured. Email sending will fail.")
     
+    def _take_slot(self, wait: bool = True) -> bool:
+        """Take a connection slot; returns False if wait is off and none is free."""
+        return self._slots is None or self._slots.acquire(blocking=wait)
+    
+    def _connect(self) -> smtplib.SMTP:
+        """
+        Open an authenticated SMTP connection in a slot the caller has taken.
+        
+        The slot is released if connecting fails; otherwise the connection
+        must be handed to _disconnect() to give it back.
+        """
+        try:
+            print(f"📨 [SMTP] Connecting to {self.smtp_host}:{self.smtp_port}...")
+            server = smtplib.SMTP(self.smtp_host, self.smtp_port)
+            try:
+                server.starttls()  # Secure the connection
+                server.login(self.smtp_user, self.smtp_password)
+            except Exception:
+                server.close()
+                raise
+        except Exception:
+            if self._slots is not None:
+                self._slots.release()
+            raise
+        return server
+    
+    def _disconnect(self, server: smtplib.SMTP, graceful: bool = True):
+        """Close a connection opened by _connect() and release its slot."""
+        try:
+            if graceful:
+                server.quit()
+            else:
+                server.close()
+        except Exception:
+            server.close()
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+    
+    def _checkout(self) -> smtplib.SMTP:
+        """
+        Borrow a pooled connection, opening one if a slot is free.
+        
+        Waits until a connection is returned to this provider's pool or a
+        slot frees up elsewhere, whichever comes first.
+        """
+        with self._pool:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._take_slot(wait=False):
+                    break
+                # No slot: a checkin wakes us, slots freed by other providers
+                # are picked up on the next poll
+                self._pool.wait(timeout=0.1)
+        
+        server = self._connect()
+        with self._pool:
+            self._connections.append(server)
+        return server
+    
+    def _checkin(self, server: smtplib.SMTP):
+        """Return a borrowed connection to the pool."""
+        with self._pool:
+            if server in self._connections:
+                self._idle.append(server)
+                self._pool.notify()
+    
+    def _discard(self, server: smtplib.SMTP):
+        """Close a borrowed connection that is no longer usable (e.g. dropped)."""
+        with self._pool:
+            if server not in self._connections:
+                # Already closed (and its slot released) by close()
+                return
+            self._connections.remove(server)
+        self._disconnect(server, graceful=False)
+    
+    def open(self):
+        """Enable connection reuse; connections are opened lazily as needed."""
+        self._is_open = True
+    
+    def close(self):
+        """Close every pooled connection opened since open()."""
+        self._is_open = False
+        with self._pool:
+            connections, self._connections, self._idle = self._connections, [], []
+        for server in connections:
+            self._disconnect(server)
+    
+    def _send_message(self, message: MIMEMultipart):
+        """Send a message over a pooled connection, or a one-off one."""
+        if not self._is_open:
+            self._take_slot()
+            server = self._connect()
+            try:
+                server.send_message(message)
+            finally:
+                self._disconnect(server)
+            return
+        
+        server = self._checkout()
+        try:
+            try:
+                server.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                # Server dropped the idle connection: reconnect once and retry
+                self._discard(server)
+                server = self._checkout()
+                server.send_message(message)
+        finally:
+            self._checkin(server)
+    
     def send(self, to_email: str, subject: str, body: str) -> bool:
         """
         Send a real email via SMTP.
@@ -124,21 +322,60 @@ class SmtpEmailProvider(IEmailProvider):
         """
         try:
             # Create message
-            message = MIMEMultipart('alternative')
-            message['From'] = self.smtp_user
+            message = self._new_message(subject)
             message['To'] = to_email
-            message['Subject'] = subject
             
             # Attach body (support both plain text and HTML)
             html_part = MIMEText(body, 'html')
             message.attach(html_part)
-            
-            # Connect to SMTP server and send
-            print(f"📨 [SMTP] Connecting to {self.smtp_host}:{self.smtp_port}...")
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()  # Secure the connection
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(message)
+        except Exception as e:
+            print(f"❌ [SMTP] Unexpected error: {str(e)}")
+            return False
+        
+        return self._deliver(message, to_email)
+    
+    def send_many(self, subject: str, messages: Iterable[Tuple[str, str]]) -> List[bool]:
+        """
+        Send personalized emails that share a subject via SMTP.
+        
+        One message object is built with the From/Subject headers and reused for
+        every recipient; only the To header and the body part are replaced.
+        
+        Args:
+            subject: Email subject line shared by all messages
+            messages: Iterable of (to_email, body) pairs
+        
+        Returns:
+            List of per-message results, in input order
+        """
+        message = self._new_message(subject)
+        message['To'] = ''
+        
+        results = []
+        for to_email, body in messages:
+            try:
+                message.replace_header('To', to_email)
+                # The charset/encoding depends on the body, so the part is rebuilt
+                message.set_payload([MIMEText(body, 'html')])
+            except Exception as e:
+                print(f"❌ [SMTP] Unexpected error: {str(e)}")
+                results.append(False)
+                continue
+            results.append(self._deliver(message, to_email))
+        return results
+    
+    def _new_message(self, subject: str) -> MIMEMultipart:
+        """Create a message with the headers shared by every recipient."""
+        message = MIMEMultipart('alternative')
+        message['From'] = self.smtp_user
+        message['Subject'] = subject
+        return message
+    
+    def _deliver(self, message: MIMEMultipart, to_email: str) -> bool:
+        """Send a fully built message, reporting failures instead of raising."""
+        try:
+            # Send over the SMTP connection
+            self._send_message(message)
             
             print(f"✅ [SMTP] Email sent successfully to {to_email}")
             return True
@@ -163,19 +400,26 @@ class EmailServiceFactory:
     """
     
     @staticmethod
-    def create_provider(use_real_email: bool = False) -> IEmailProvider:
+    def create_provider(
+        use_real_email: bool = False,
+        verbose: bool = False,
+        connection_slots: Optional[threading.Semaphore] = None
+    ) -> IEmailProvider:
         """
         Create and return the appropriate email provider.
         
         Args:
             use_real_email: If True, returns SmtpEmailProvider; otherwise MockEmailProvider
+            verbose: If True, the mock provider logs every simulated email
+            connection_slots: Semaphore shared by SMTP providers to bound
+                their total open connections
         
         Returns:
             An instance of IEmailProvider (either Mock or SMTP)
         """
         if use_real_email:
             print("🔧 Using SMTP Email Provider (Real Emails)")
-            return SmtpEmailProvider()
+            return SmtpEmailProvider(connection_slots=connection_slots)
         else:
             print("🔧 Using Mock Email Provider (Simulation Mode)")
-            return MockEmailProvider()
+            return MockEmailProvider(verbose=verbose)
@@ -2,9 +2,27 @@
 Customer Segmentation Service
 Business logic for filtering and segmenting customers based on dynamic criteria.
 """
-from typing import List, Dict, Optional
+import math
+import threading
+from collections import OrderedDict
+from itertools import islice
+from operator import attrgetter
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 from src.models.customer import Customer
-from src.repository.json_repo import JsonRepository
+from src.repository.customer_repo import CustomerRepository
+
+# Number of (data version, criteria) -> audience size entries kept
+AUDIENCE_CACHE_SIZE = 256
+
+# Number of criteria -> compiled predicate entries kept
+PREDICATE_CACHE_SIZE = 256
+
+# NumPy enables vectorized filtering over column arrays; without it the
+# service falls back to the per-customer Python loop.
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class SegmentationService:
@@ -14,27 +32,160 @@ class SegmentationService:
     This service provides functionality to retrieve and filter customers
     based on various criteria (city, age, spending patterns, etc.).
     Implements the business logic layer for customer segmentation.
+    
+    When NumPy is available, the customer repository also keeps the numeric
+    and categorical fields as column arrays (struct-of-arrays), so
+    filter_customers() evaluates criteria as vectorized comparisons, starting
+    from the city index when a city is given.
     """
     
-    def __init__(self, customer_repository: JsonRepository[Customer]):
+    def __init__(self, customer_repository: CustomerRepository, audience_cache_size: int = AUDIENCE_CACHE_SIZE):
         """
         Initialize the segmentation service.
         
         Args:
             customer_repository: Repository for customer data access
+            audience_cache_size: Maximum number of cached audience sizes
         """
         self.customer_repository = customer_repository
+        # Last customer list seen from the repository; derived data is rebuilt
+        # whenever the repository hands out a different list
+        self._customers_cache: Optional[List[Customer]] = None
+        # Value distribution of the customer data, used to order filter checks
+        self._profile: Optional[Dict] = None
+        self._profile_source: Optional[List[Customer]] = None
+        # (data version, criteria as a frozenset of items) -> matching customer
+        # count, least recently used first
+        self._audience_sizes: 'OrderedDict[Tuple[int, frozenset], int]' = OrderedDict()
+        self._audience_cache_size = audience_cache_size
+        self._audience_lock = threading.Lock()
+        # Criteria (as a frozenset of items) -> compiled predicate, least
+        # recently used first, valid for the profile its checks were ordered by
+        self._predicates: 'OrderedDict[frozenset, Optional[Callable[[Customer], bool]]]' = OrderedDict()
+        self._predicates_profile: Optional[Dict] = None
+        self._predicates_lock = threading.Lock()
     
     def get_all_customers(self) -> List[Customer]:
         """
         Retrieve all customers from the repository.
         
+        The repository keeps the materialized list until the data changes, so
+        repeated calls within and across requests reuse the same Customer
+        objects. Callers must not mutate the returned list.
+        
         Returns:
             List of all Customer objects
         """
-        return self.customer_repository.get_all()
+        customers = self.customer_repository.get_all()
+        self._customers_cache = customers
+        return customers
     
-    def filter_customers(self, criteria: Dict) -> List[Customer]:
+    def get_customers_by_ids(self, customer_ids: List[str], limit: Optional[int] = None) -> List[Customer]:
+        """
+        Retrieve customers by ID, e.g. the members of a saved segment.
+        
+        Args:
+            customer_ids: Customer IDs in the desired order
+            limit: Maximum number of customers to return (None for all)
+        
+        Returns:
+            List of the customers that still exist, in the given order
+        """
+        return self.customer_repository.get_by_ids(customer_ids, limit=limit)
+    
+    def count_customers_by_ids(self, customer_ids: List[str]) -> int:
+        """
+        Count the customers among the given IDs that still exist.
+        
+        Args:
+            customer_ids: Customer IDs, e.g. the members of a saved segment
+        
+        Returns:
+            Number of IDs that resolve to a customer
+        """
+        return self.customer_repository.count_by_ids(customer_ids)
+    
+    def get_cities_sorted(self) -> List[str]:
+        """
+        Get the sorted list of distinct customer cities.
+        
+        The list is kept by the repository and only recomputed when the
+        customer data changes. Callers must not mutate the returned list.
+        
+        Returns:
+            Alphabetically sorted list of city names
+        """
+        return self.customer_repository.get_cities_sorted()
+    
+    def get_unique_cities(self) -> List[str]:
+        """
+        Get the sorted list of distinct customer cities.
+        
+        Served from the repository's city index, so it is only recomputed
+        when the customer data changes. Callers must not mutate the
+        returned list.
+        
+        Returns:
+            Alphabetically sorted list of city names
+        """
+        return self.customer_repository.get_cities_sorted()
+    
+    def _get_profile(self) -> Dict:
+        """
+        Summarize the customer data for selectivity estimates.
+        
+        Records the per-city counts, the number of active customers and the
+        min/max of each numeric field in one pass. Memoized until the
+        repository hands out a different customer list.
+        
+        Returns:
+            Dictionary with 'count', 'cities', 'active' and per-field
+            (min, max) tuples under 'age', 'total_spent', 'spending_score'
+        """
+        customers = self.get_all_customers()
+        if self._profile is not None and self._profile_source is customers:
+            return self._profile
+        
+        cities: Dict[str, int] = {}
+        active = 0
+        ranges = {}
+        if customers:
+            first = customers[0]
+            min_age = max_age = first.age
+            min_spent = max_spent = first.total_spent
+            min_score = max_score = first.spending_score
+            for c in customers:
+                cities[c._city_lc] = cities.get(c._city_lc, 0) + 1
+                if c.is_active:
+                    active += 1
+                if c.age < min_age:
+                    min_age = c.age
+                elif c.age > max_age:
+                    max_age = c.age
+                if c.total_spent < min_spent:
+                    min_spent = c.total_spent
+                elif c.total_spent > max_spent:
+                    max_spent = c.total_spent
+                if c.spending_score < min_score:
+                    min_score = c.spending_score
+                elif c.spending_score > max_score:
+                    max_score = c.spending_score
+            ranges = {
+                'age': (min_age, max_age),
+                'total_spent': (min_spent, max_spent),
+                'spending_score': (min_score, max_score),
+            }
+        
+        self._profile = {
+            'count': len(customers),
+            'cities': cities,
+            'active': active,
+            **ranges
+        }
+        self._profile_source = customers
+        return self._profile
+    
+    def filter_customers(self, criteria: Dict, source: Optional[List[Customer]] = None) -> List[Customer]:
         """
         Filter customers based on dynamic criteria using AND logic.
         
@@ -52,6 +203,8 @@ class SegmentationService:
         
         Args:
             criteria: Dictionary containing filter conditions
+            source: Pre-loaded customer list to filter instead of fetching
+                all customers again
         
         Returns:
             List of Customer objects matching ALL criteria
@@ -64,65 +217,368 @@ class SegmentationService:
                 'is_active': True
             }
         """
+        all_customers = source if source is not None else self.get_all_customers()
+        
+        columns = self.customer_repository.get_columns()
+        if columns is not None and columns[0] is all_customers:
+            return self._filter_vectorized(criteria, *columns)
+        
+        candidates, predicate = self._prepare_scan(all_customers, criteria)
+        if predicate is None:
+            return list(candidates)
+        
+        return [customer for customer in candidates if predicate(customer)]
+    
+    def filter_customers_iter(
+        self,
+        criteria: Dict,
+        limit: Optional[int] = None,
+        source: Optional[List[Customer]] = None
+    ) -> Iterator[Customer]:
+        """
+        Lazily yield the customers matching the criteria, in original order.
+        
+        Same semantics as filter_customers(), but stops after `limit` matches,
+        so callers that only need a preview don't build the full result.
+        
+        Args:
+            criteria: Dictionary containing filter conditions
+            limit: Maximum number of customers to yield (None for all)
+            source: Pre-loaded customer list to filter instead of fetching
+                all customers again
+        
+        Returns:
+            Iterator over matching Customer objects
+        """
+        all_customers = source if source is not None else self.get_all_customers()
+        
+        columns = self.customer_repository.get_columns()
+        if columns is not None and columns[0] is all_customers:
+            return iter(self._filter_vectorized(criteria, *columns, limit=limit))
+        
+        candidates, predicate = self._prepare_scan(all_customers, criteria)
+        matches = filter(predicate, candidates) if predicate is not None else iter(candidates)
+        return islice(matches, limit) if limit is not None else matches
+    
+    def _prepare_scan(
+        self,
+        all_customers: List[Customer],
+        criteria: Dict
+    ) -> Tuple[List[Customer], Optional[Callable[[Customer], bool]]]:
+        """Pick the candidates to scan and the predicate left to run on them (None if any match)."""
+        profile = self._get_profile()
+        candidates = all_customers
+        if all_customers is self._customers_cache:
+            candidates, criteria = self._candidates_from_indexes(all_customers, criteria)
+        return candidates, self._get_predicate(criteria, profile)
+    
+    def _get_predicate(self, criteria: Dict, profile: Dict) -> Optional[Callable[[Customer], bool]]:
+        """
+        Return the compiled predicate for the criteria, compiling it once.
+        
+        Predicates are kept in a bounded LRU cache keyed by the criteria, so
+        repeated filters with the same criteria (e.g. every view of a
+        campaign) reuse one closure. The cache is emptied when the data
+        profile that orders the checks changes.
+        """
+        try:
+            key = frozenset(criteria.items())
+        except TypeError:
+            # Unhashable criteria values can't be cached
+            return self._compile_predicate(criteria, profile)
+        
+        with self._predicates_lock:
+            if self._predicates_profile is not profile:
+                self._predicates.clear()
+                self._predicates_profile = profile
+            elif key in self._predicates:
+                self._predicates.move_to_end(key)
+                return self._predicates[key]
+        
+        predicate = self._compile_predicate(criteria, profile)
+        with self._predicates_lock:
+            if self._predicates_profile is profile:
+                self._predicates[key] = predicate
+                self._predicates.move_to_end(key)
+                while len(self._predicates) > PREDICATE_CACHE_SIZE:
+                    self._predicates.popitem(last=False)
+        return predicate
+    
+    @classmethod
+    def _compile_predicate(cls, criteria: Dict, profile: Optional[Dict] = None) -> Optional[Callable[[Customer], bool]]:
+        """
+        Combine the checks for the criteria into a single predicate.
+        
+        The checks from _compile_predicates() are chained with `and` in
+        selectivity order, so the scan makes one call per customer and no
+        criteria lookups.
+        
+        Returns:
+            Predicate returning True for matching customers, or None if the
+            criteria don't restrict anything
+        """
+        checks = cls._compile_predicates(criteria, profile)
+        if not checks:
+            return None
+        
+        predicate = checks[-1]
+        for check in reversed(checks[:-1]):
+            predicate = lambda c, first=check, rest=predicate: first(c) and rest(c)
+        return predicate
+    
+    def get_audience_size(self, criteria: Dict) -> int:
+        """
+        Count the customers matching the criteria.
+        
+        Counts are kept in a bounded LRU cache keyed by the customer data
+        version and the criteria, so repeated views of the same segment (e.g.
+        a campaign detail page) don't re-run the filter, and counts for older
+        data versions are never served and simply age out.
+        
+        Args:
+            criteria: Dictionary containing filter conditions
+        
+        Returns:
+            Number of customers matching ALL criteria
+        """
+        version = self.customer_repository.version
         all_customers = self.get_all_customers()
-        filtered_customers = []
         
-        for customer in all_customers:
-            if self._matches_criteria(customer, criteria):
-                filtered_customers.append(customer)
+        try:
+            key = (version, frozenset(criteria.items()))
+        except TypeError:
+            # Unhashable criteria values can't be cached
+            return len(self.filter_customers(criteria, source=all_customers))
+        
+        with self._audience_lock:
+            size = self._audience_sizes.get(key)
+            if size is not None:
+                self._audience_sizes.move_to_end(key)
+                return size
         
-        return filtered_customers
+        size = len(self.filter_customers(criteria, source=all_customers))
+        with self._audience_lock:
+            self._audience_sizes[key] = size
+            self._audience_sizes.move_to_end(key)
+            while len(self._audience_sizes) > self._audience_cache_size:
+                self._audience_sizes.popitem(last=False)
+        return size
     
-    def _matches_criteria(self, customer: Customer, criteria: Dict) -> bool:
+    def _candidates_from_indexes(self, customers: List[Customer], criteria: Dict) -> Tuple[List[Customer], Dict]:
         """
-        Check if a customer matches all provided criteria.
+        Narrow the customers to scan using the repository's secondary indexes.
+        
+        A city criterion reads that city's customers straight off the inverted
+        index (already in original order); an active-status criterion narrows
+        them further by set membership. Only the resulting candidates are
+        checked against the remaining (range) criteria.
+        
+        Returns:
+            (candidate customers in original order, criteria still to check)
+        """
+        indexed_customers, by_city, by_active = self.customer_repository.get_indexes()
+        if indexed_customers is not customers:
+            # Indexes describe newer data than the given list; scan everything
+            return customers, criteria
+        
+        city = criteria.get('city')
+        is_active = criteria.get('is_active')
+        if city:
+            positions = by_city.get(city.lower(), ())
+            if is_active is not None:
+                active = by_active.get(is_active, frozenset())
+                positions = [i for i in positions if i in active]
+            indexed = ('city', 'is_active')
+        elif is_active is not None:
+            positions = sorted(by_active.get(is_active, frozenset()))
+            indexed = ('is_active',)
+        else:
+            return customers, criteria
+        
+        candidates = [customers[i] for i in positions]
+        remaining = {key: value for key, value in criteria.items() if key not in indexed}
+        return candidates, remaining
+    
+    def _filter_vectorized(
+        self,
+        criteria: Dict,
+        customers: List[Customer],
+        columns: Dict,
+        city_codes: Dict[str, int],
+        limit: Optional[int] = None
+    ) -> List[Customer]:
+        """
+        Evaluate criteria over the column arrays, narrowing a position array.
+        
+        Same semantics as _compile_predicates(). A city criterion starts from
+        that city's positions in the repository's inverted index, so the scan
+        only touches the city's customers. The remaining checks run in
+        selectivity order (see _plan_checks()) and each one compares only the
+        rows that passed the checks before it. The matching Customer objects
+        are gathered in their original order.
+        """
+        # Positions still matching; None means every row
+        positions = None
+        
+        city = criteria.get('city')
+        if city:
+            indexed_customers, by_city, _ = self.customer_repository.get_indexes()
+            if indexed_customers is customers:
+                positions = np.array(by_city.get(city.lower(), ()), dtype=np.intp)
+                criteria = {key: value for key, value in criteria.items() if key != 'city'}
+        
+        for field, op, value in self._plan_checks(criteria, self._get_profile()):
+            if positions is not None and not len(positions):
+                return []
+            values = columns[field] if positions is None else columns[field][positions]
+            
+            if field == 'city':
+                code = city_codes.get(value)
+                if code is None:
+                    return []
+                keep = values == code
+            elif op == 'eq':
+                keep = values == value
+            else:
+                threshold, outcome = self._column_threshold(values, value, op == 'ge')
+                if outcome is False:
+                    return []
+                if outcome:
+                    continue
+                keep = values >= threshold if op == 'ge' else values <= threshold
+            
+            positions = np.flatnonzero(keep) if positions is None else positions[keep]
+        
+        if positions is None:
+            return list(customers[:limit] if limit is not None else customers)
+        if limit is not None:
+            positions = positions[:limit]
+        return [customers[i] for i in positions]
+    
+    @staticmethod
+    def _column_threshold(values: 'np.ndarray', value, lower_bound: bool) -> Tuple[object, Optional[bool]]:
+        """
+        Coerce a range threshold to the dtype of a narrow integer column.
+        
+        Keeps the comparison in the column's own dtype instead of upcasting the
+        whole column. Thresholds outside the dtype's range decide the outcome
+        for every row without comparing.
         
         Args:
-            customer: Customer object to check
-            criteria: Dictionary of filter conditions
+            values: Column array being compared
+            value: Threshold from the criteria
+            lower_bound: True for `>= value`, False for `<= value`
         
         Returns:
-            True if customer matches all criteria, False otherwise
+            (threshold, None) to compare against, or (None, True/False) when
+            every row passes or fails
         """
-        # City filter (exact match, case-insensitive)
-        if 'city' in criteria and criteria['city']:
-            if customer.city.lower() != criteria['city'].lower():
-                return False
+        if values.dtype.kind not in 'iu':
+            return value, None
+        try:
+            bound = math.ceil(value) if lower_bound else math.floor(value)
+        except (TypeError, ValueError, OverflowError):
+            return value, None
+        
+        info = np.iinfo(values.dtype)
+        if bound > info.max:
+            return None, not lower_bound
+        if bound < info.min:
+            return None, lower_bound
+        return values.dtype.type(bound), None
+    
+    @staticmethod
+    def _plan_checks(criteria: Dict, profile: Optional[Dict] = None) -> List[Tuple[str, str, object]]:
+        """
+        Turn criteria into the list of field checks, most selective first.
         
-        # Age filters
-        if 'min_age' in criteria and criteria['min_age'] is not None:
-            if customer.age < criteria['min_age']:
-                return False
+        Criteria are inspected once per filter call, so the per-customer (or
+        per-column) work only covers the checks that are actually present.
+        Checks are ordered by their estimated pass rate so that a scan rejects
+        most customers on the first check.
         
-        if 'max_age' in criteria and criteria['max_age'] is not None:
-            if customer.age > criteria['max_age']:
-                return False
+        Args:
+            criteria: Dictionary of filter conditions
+            profile: Optional data summary from _get_profile(); without it
+                the checks keep their declaration order
         
-        # Total spent filters
-        if 'min_spent' in criteria and criteria['min_spent'] is not None:
-            if customer.total_spent < criteria['min_spent']:
-                return False
+        Returns:
+            List of (field, op, value) with op one of 'eq', 'ge', 'le'; city
+            values are lowercased
+        """
+        count = profile['count'] if profile else 0
         
-        if 'max_spent' in criteria and criteria['max_spent'] is not None:
-            if customer.total_spent > criteria['max_spent']:
-                return False
+        def range_rate(field: str, low=None, high=None) -> float:
+            # Assume values are spread uniformly between the observed min/max
+            if not count:
+                return 0.5
+            lo, hi = profile[field]
+            if hi <= lo:
+                return 1.0
+            low = lo if low is None else max(low, lo)
+            high = hi if high is None else min(high, hi)
+            return max(0.0, min(1.0, (high - low) / (hi - lo)))
         
-        # Spending score filters
-        if 'min_spending_score' in criteria and criteria['min_spending_score'] is not None:
-            if customer.spending_score < criteria['min_spending_score']:
-                return False
+        checks = []
         
-        if 'max_spending_score' in criteria and criteria['max_spending_score'] is not None:
-            if customer.spending_score > criteria['max_spending_score']:
-                return False
+        # City filter (exact match, case-insensitive)
+        if criteria.get('city'):
+            city = criteria['city'].lower()
+            rate = profile['cities'].get(city, 0) / count if count else 0.5
+            checks.append((rate, ('city', 'eq', city)))
+        
+        # Range filters (age, total spent, spending score)
+        for key, field, op in (
+            ('min_age', 'age', 'ge'),
+            ('max_age', 'age', 'le'),
+            ('min_spent', 'total_spent', 'ge'),
+            ('max_spent', 'total_spent', 'le'),
+            ('min_spending_score', 'spending_score', 'ge'),
+            ('max_spending_score', 'spending_score', 'le'),
+        ):
+            v = criteria.get(key)
+            if v is not None:
+                rate = range_rate(field, low=v) if op == 'ge' else range_rate(field, high=v)
+                checks.append((rate, (field, op, v)))
         
         # Active status filter
-        if 'is_active' in criteria and criteria['is_active'] is not None:
-            if customer.is_active != criteria['is_active']:
-                return False
+        if criteria.get('is_active') is not None:
+            v = criteria['is_active']
+            active_rate = profile['active'] / count if count else 0.5
+            rate = active_rate if v else 1.0 - active_rate
+            checks.append((rate, ('is_active', 'eq', v)))
+        
+        # Stable sort: ties keep the declaration order above
+        checks.sort(key=lambda pair: pair[0])
+        return [check for _, check in checks]
+    
+    @classmethod
+    def _compile_predicates(cls, criteria: Dict, profile: Optional[Dict] = None) -> List[Callable[[Customer], bool]]:
+        """
+        Build the list of checks a customer must pass for the given criteria.
         
-        # All criteria matched
-        return True
+        Args:
+            criteria: Dictionary of filter conditions
+            profile: Optional data summary used to order the checks
+        
+        Returns:
+            List of predicates, in _plan_checks() order; a customer matches
+            when all of them return True
+        """
+        checks = []
+        for field, op, v in cls._plan_checks(criteria, profile):
+            if field == 'city':
+                checks.append(lambda c, v=v: c._city_lc == v)
+            elif op == 'eq':
+                get = attrgetter(field)
+                checks.append(lambda c, get=get, v=v: get(c) == v)
+            elif op == 'ge':
+                get = attrgetter(field)
+                checks.append(lambda c, get=get, v=v: get(c) >= v)
+            else:
+                get = attrgetter(field)
+                checks.append(lambda c, get=get, v=v: get(c) <= v)
+        return checks
     
     def get_segment_statistics(self, customers: List[Customer]) -> Dict:
         """
@@ -144,10 +600,17 @@ class SegmentationService:
                 'avg_revenue_per_customer': 0
             }
         
-        active_count = sum(1 for c in customers if c.is_active)
-        total_age = sum(c.age for c in customers)
-        total_spending_score = sum(c.spending_score for c in customers)
-        total_revenue = sum(c.total_spent for c in customers)
+        # Single pass over the segment for all aggregates
+        active_count = 0
+        total_age = 0
+        total_spending_score = 0
+        total_revenue = 0
+        for c in customers:
+            if c.is_active:
+                active_count += 1
+            total_age += c.age
+            total_spending_score += c.spending_score
+            total_revenue += c.total_spent
         
         return {
             'total_count': len(customers),
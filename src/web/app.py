@@ -6,23 +6,111 @@ This module implements the Presentation Layer following the Layered Architecture
 NO BUSINESS LOGIC should be placed here - only routing, request handling, and view rendering.
 All business logic is delegated to the Service Layer.
 """
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
-from functools import wraps
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, g, abort
+from flask.json.provider import DefaultJSONProvider
+from functools import lru_cache, wraps
+from heapq import nlargest
+import math
 import os
 import sys
+from typing import Optional
 
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-# Import models, repositories, and services
-from src.models.customer import Customer
-from src.models.campaign import Campaign
-from src.repository.json_repo import JsonRepository
+# Import repositories and services
+from src.repository.customer_repo import CustomerRepository
+from src.repository.campaign_repo import CampaignRepository
+from src.repository.json_repo import DataFileError
 from src.services.segmentation import SegmentationService
 from src.services.campaign import CampaignService
 from src.services.analytics import AnalyticsService
 from config import config
 
+# orjson serializes API responses straight to bytes, several times faster
+# than the stdlib encoder; Flask's default provider is used if it's missing.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# ============================================================================
+# JSON PROVIDER
+# ============================================================================
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+    
+    datetime and dataclass values, which orjson would encode itself, are
+    passed through to Flask's default() like every other type orjson doesn't
+    handle, so they serialize exactly as with the stdlib provider (HTTP date
+    strings, dataclasses.asdict()). orjson always writes UTF-8 instead of
+    \\u escapes (so ensure_ascii is off) and compact separators; dumps()
+    calls asking for anything orjson can't produce (ensure_ascii=True, an
+    indent other than 2, other separators or other json.dumps() arguments)
+    go to the stdlib encoder.
+    """
+    
+    ensure_ascii = False
+    
+    def dumps(self, obj, **kwargs) -> str:
+        option = self._option_for(kwargs)
+        if option is None:
+            return super().dumps(obj, **kwargs)
+        default = kwargs.get('default', self.default)
+        return orjson.dumps(obj, default=default, option=option).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        # orjson has no object_hook, which the session serializer relies on
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Same layout rules as DefaultJSONProvider.response()
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option = self._option_for({'indent': 2})
+        else:
+            option = self._option_for({})
+        body = orjson.dumps(obj, default=self.default, option=option) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+    
+    def _option_for(self, kwargs: dict) -> Optional[int]:
+        """
+        Translate json.dumps() keyword arguments into orjson options.
+        
+        Returns:
+            The orjson option flags, or None if the arguments ask for output
+            orjson can't produce
+        """
+        kwargs = dict(kwargs)
+        kwargs.pop('default', None)
+        indent = kwargs.pop('indent', None)
+        separators = kwargs.pop('separators', None)
+        if (
+            kwargs.pop('ensure_ascii', self.ensure_ascii)
+            or indent not in (None, 2)
+            or separators not in (None, (',', ':'))
+        ):
+            return None
+        sort_keys = kwargs.pop('sort_keys', self.sort_keys)
+        if kwargs:
+            return None
+        
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        return option
+
 
 # ============================================================================
 # APPLICATION FACTORY & DEPENDENCY INJECTION
@@ -41,29 +129,48 @@ def create_app(config_name='development'):
     """
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    if orjson is not None:
+        app.json = ORJSONProvider(app)
     
     # Initialize repositories (Data Layer)
-    customer_repository = JsonRepository(
+    customer_repository = CustomerRepository(
         app.config['CUSTOMERS_DATA_FILE'],
-        Customer.from_dict,
-        lambda c: c.to_dict()
+        cache_path=app.config['CUSTOMERS_CACHE_FILE']
     )
-    
-    campaign_repository = JsonRepository(
+    campaign_repository = CampaignRepository(
         app.config['CAMPAIGNS_DATA_FILE'],
-        Campaign.from_dict,
-        lambda c: c.to_dict()
+        segments_dir=app.config['CAMPAIGN_SEGMENTS_DIR']
     )
     
     # Initialize services (Business Logic Layer)
-    segmentation_service = SegmentationService(customer_repository)
-    analytics_service = AnalyticsService(campaign_repository)
+    segmentation_service = SegmentationService(
+        customer_repository,
+        audience_cache_size=app.config['AUDIENCE_CACHE_SIZE']
+    )
+    analytics_service = AnalyticsService(
+        campaign_repository,
+        verbose=app.config['DEBUG']
+    )
     campaign_service = CampaignService(
         campaign_repository, 
         segmentation_service,
-        analytics_service  # Phase 4: Inject analytics service
+        analytics_service,  # Phase 4: Inject analytics service
+        max_send_workers=app.config['EMAIL_MAX_WORKERS'],
+        verbose_mock_email=app.config['MOCK_EMAIL_VERBOSE'],
+        launch_queue_workers=app.config['LAUNCH_QUEUE_WORKERS'],
+        send_batch_size=app.config['EMAIL_BATCH_SIZE'],
+        stats_flush_interval=app.config['STATS_FLUSH_INTERVAL'],
+        launch_stale_after=app.config['LAUNCH_STALE_AFTER'],
+        max_smtp_connections=app.config['SMTP_MAX_CONNECTIONS']
     )
     
+    # Release campaigns whose launch died with an earlier process; a broken
+    # campaigns file must not keep the app from starting
+    try:
+        campaign_service.recover_interrupted_launches()
+    except DataFileError as e:
+        print(f"⚠️  Skipped recovery of interrupted launches: {str(e)}")
+    
     # Store services in app context for access in routes
     app.segmentation_service = segmentation_service
     app.campaign_service = campaign_service
@@ -94,6 +201,87 @@ def login_required(f):
     return decorated_function
 
 
+# ============================================================================
+# FORM PARSING
+# ============================================================================
+
+def finite_float(value: str) -> float:
+    """
+    Convert a form value to float, rejecting 'nan' and 'inf'.
+    
+    float() accepts those spellings, but a non-finite bound makes a range
+    criterion meaningless (every comparison with nan is False).
+    
+    Raises:
+        ValueError: If the value isn't a finite number
+    """
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f'Not a finite number: {value}')
+    return number
+
+
+# Segmentation form fields and how each value is converted into a criterion
+CRITERIA_FIELDS = (
+    ('city', str),
+    ('min_age', int),
+    ('max_age', int),
+    ('min_spending_score', int),
+    ('max_spending_score', int),
+    ('min_spent', finite_float),
+    ('max_spent', finite_float),
+    ('is_active', lambda value: value == 'true'),
+)
+
+
+def criteria_from_form(form) -> dict:
+    """
+    Build a segmentation criteria dictionary from submitted form fields.
+    
+    Empty fields are skipped; the others are converted according to
+    CRITERIA_FIELDS.
+    
+    Raises:
+        ValueError: If a numeric field doesn't hold a valid, finite number
+    """
+    criteria = {}
+    for key, convert in CRITERIA_FIELDS:
+        value = form.get(key, '').strip()
+        if value:
+            try:
+                criteria[key] = convert(value)
+            except ValueError:
+                raise ValueError(f'Invalid value for {key.replace("_", " ")}: {value}')
+    return criteria
+
+
+# ============================================================================
+# REQUEST-SCOPED DATA
+# ============================================================================
+
+def get_request_customers():
+    """
+    Return all customers, loaded at most once per request.
+    
+    The list is memoized on flask.g so views and helpers handling the same
+    request share a single repository read.
+    """
+    if 'customers' not in g:
+        g.customers = app.segmentation_service.get_all_customers()
+    return g.customers
+
+
+def get_request_campaigns():
+    """
+    Return all campaigns, loaded at most once per request.
+    
+    Memoized on flask.g like get_request_customers().
+    """
+    if 'campaigns' not in g:
+        g.campaigns = app.campaign_service.get_all_campaigns()
+    return g.campaigns
+
+
 # ============================================================================
 # ROUTES - AUTHENTICATION
 # ============================================================================
@@ -161,27 +349,28 @@ def dashboard():
     - Recent campaigns list
     """
     # Delegate to Service Layer - NO business logic here
-    all_customers = app.segmentation_service.get_all_customers()
+    all_customers = get_request_customers()
     active_customers = [c for c in all_customers if c.is_active]
     
-    all_campaigns = app.campaign_service.get_all_campaigns()
-    sent_campaigns = app.campaign_service.get_sent_campaigns()
+    all_campaigns = get_request_campaigns()
+    # Per-status counts come from the service's status index
+    status_counts = app.campaign_service.count_campaigns_by_status()
     
     # Prepare data for view
     stats = {
         'total_customers': len(all_customers),
         'active_customers': len(active_customers),
         'total_campaigns': len(all_campaigns),
-        'sent_campaigns': len(sent_campaigns),
-        'draft_campaigns': len(all_campaigns) - len(sent_campaigns)
+        'sent_campaigns': status_counts.get('Sent', 0),
+        'draft_campaigns': status_counts.get('Draft', 0)
     }
     
-    # Get recent campaigns (last 5)
-    recent_campaigns = sorted(
+    # Get recent campaigns (last 5) without sorting the whole list
+    recent_campaigns = nlargest(
+        5,
         all_campaigns,
-        key=lambda c: c.created_at if c.created_at else '',
-        reverse=True
-    )[:5]
+        key=lambda c: c.created_at if c.created_at else ''
+    )
     
     return render_template(
         'dashboard.html',
@@ -214,49 +403,30 @@ def segmentation():
     criteria = {}
     stats = None
     
+    # Load customers once; filtering and the city dropdown share it
+    all_customers = get_request_customers()
+    
     if request.method == 'POST':
         # Build criteria from form data
-        city = request.form.get('city', '').strip()
-        min_age = request.form.get('min_age', '').strip()
-        max_age = request.form.get('max_age', '').strip()
-        min_spending_score = request.form.get('min_spending_score', '').strip()
-        max_spending_score = request.form.get('max_spending_score', '').strip()
-        min_spent = request.form.get('min_spent', '').strip()
-        max_spent = request.form.get('max_spent', '').strip()
-        is_active = request.form.get('is_active', '')
-        
-        # Build criteria dictionary
-        if city:
-            criteria['city'] = city
-        if min_age:
-            criteria['min_age'] = int(min_age)
-        if max_age:
-            criteria['max_age'] = int(max_age)
-        if min_spending_score:
-            criteria['min_spending_score'] = int(min_spending_score)
-        if max_spending_score:
-            criteria['max_spending_score'] = int(max_spending_score)
-        if min_spent:
-            criteria['min_spent'] = float(min_spent)
-        if max_spent:
-            criteria['max_spent'] = float(max_spent)
-        if is_active:
-            criteria['is_active'] = is_active == 'true'
+        try:
+            criteria = criteria_from_form(request.form)
+        except ValueError as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('segmentation'))
         
         # Delegate to Service Layer
         if criteria:
-            customers = app.segmentation_service.filter_customers(criteria)
+            customers = app.segmentation_service.filter_customers(criteria, source=all_customers)
             stats = app.segmentation_service.get_segment_statistics(customers)
             
             flash(f'Found {len(customers)} customers matching your criteria.', 'success')
         else:
-            customers = app.segmentation_service.get_all_customers()
+            customers = all_customers
             stats = app.segmentation_service.get_segment_statistics(customers)
             flash('Showing all customers (no filters applied).', 'info')
     
     # Get unique cities for dropdown
-    all_customers = app.segmentation_service.get_all_customers()
-    cities = sorted(list(set(c.city for c in all_customers)))
+    cities = app.segmentation_service.get_unique_cities()
     
     return render_template(
         'segmentation.html',
@@ -275,18 +445,23 @@ def segmentation():
 @login_required
 def campaigns_list():
     """
-    Campaigns list route - displays all campaigns.
+    Campaigns list route - displays the first page of campaigns.
+    
+    Further pages are fetched by the browser from /api/campaigns.
     """
-    all_campaigns = app.campaign_service.get_all_campaigns()
+    # Already ordered by created_at (most recent first)
+    all_campaigns = app.campaign_service.get_campaigns_newest_first()
+    page_size = app.config['CAMPAIGNS_PAGE_SIZE']
+    campaigns = all_campaigns[:page_size]
     
-    # Sort by created_at (most recent first)
-    all_campaigns = sorted(
-        all_campaigns,
-        key=lambda c: c.created_at if c.created_at else '',
-        reverse=True
+    return render_template(
+        'campaigns.html',
+        campaigns=campaigns,
+        total_campaigns=len(all_campaigns),
+        status_counts=app.campaign_service.count_campaigns_by_status(),
+        next_after=campaigns[-1].id if len(all_campaigns) > page_size else None,
+        page_size=page_size
     )
-    
-    return render_template('campaigns.html', campaigns=all_campaigns)
 
 
 @app.route('/campaigns/new', methods=['GET', 'POST'])
@@ -299,37 +474,21 @@ def campaign_new():
     POST: Process form and create campaign
     """
     if request.method == 'POST':
+        # Only parse a plain HTML form body; anything else is never sent by
+        # the campaign form and isn't worth handing to the form parser
+        if request.mimetype != 'application/x-www-form-urlencoded':
+            abort(415)
+        
         # Extract form data
         title = request.form.get('title', '').strip()
         content_template = request.form.get('content_template', '').strip()
         
         # Build segmentation criteria from form
-        criteria = {}
-        city = request.form.get('city', '').strip()
-        min_age = request.form.get('min_age', '').strip()
-        max_age = request.form.get('max_age', '').strip()
-        min_spending_score = request.form.get('min_spending_score', '').strip()
-        max_spending_score = request.form.get('max_spending_score', '').strip()
-        min_spent = request.form.get('min_spent', '').strip()
-        max_spent = request.form.get('max_spent', '').strip()
-        is_active = request.form.get('is_active', '')
-        
-        if city:
-            criteria['city'] = city
-        if min_age:
-            criteria['min_age'] = int(min_age)
-        if max_age:
-            criteria['max_age'] = int(max_age)
-        if min_spending_score:
-            criteria['min_spending_score'] = int(min_spending_score)
-        if max_spending_score:
-            criteria['max_spending_score'] = int(max_spending_score)
-        if min_spent:
-            criteria['min_spent'] = float(min_spent)
-        if max_spent:
-            criteria['max_spent'] = float(max_spent)
-        if is_active:
-            criteria['is_active'] = is_active == 'true'
+        try:
+            criteria = criteria_from_form(request.form)
+        except ValueError as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('campaign_new'))
         
         # Validate
         if not title:
@@ -360,8 +519,8 @@ def campaign_new():
             return redirect(url_for('campaign_new'))
     
     # GET request - show form
-    all_customers = app.segmentation_service.get_all_customers()
-    cities = sorted(list(set(c.city for c in all_customers)))
+    # Memoized in the service; recomputed only when customer data changes
+    cities = app.segmentation_service.get_cities_sorted()
     
     return render_template('campaign_new.html', cities=cities)
 
@@ -382,16 +541,15 @@ def campaign_detail(campaign_id):
         flash('Campaign not found.', 'danger')
         return redirect(url_for('campaigns_list'))
     
-    # Get target audience preview
-    target_customers = app.segmentation_service.filter_customers(
-        campaign.target_segment_criteria
-    )
+    # Audience size and preview (first 10) come from the saved segment
+    target_audience_size = app.campaign_service.get_target_audience_size(campaign)
+    target_customers = app.campaign_service.get_target_customers(campaign, limit=10)
     
     return render_template(
         'campaign_detail.html',
         campaign=campaign,
-        target_audience_size=len(target_customers),
-        target_customers=target_customers[:10]  # Preview first 10
+        target_audience_size=target_audience_size,
+        target_customers=target_customers
     )
 
 
@@ -399,30 +557,52 @@ def campaign_detail(campaign_id):
 @login_required
 def campaign_launch(campaign_id):
     """
-    Launch campaign route - triggers email sending.
+    Launch campaign route - queues email sending.
+    
+    Emails are sent in the background so the request returns immediately;
+    the detail page shows the campaign as 'Sending' until it completes.
+    Clients that accept JSON get 202 Accepted instead of a redirect.
     
     Args:
         campaign_id: Campaign unique identifier
     """
     use_real_email = request.form.get('use_real_email') == 'true'
+    wants_json = request.accept_mimetypes.best == 'application/json'
     
     try:
         # Delegate to Service Layer - Strategy Pattern in action!
-        result = app.campaign_service.launch_campaign(
+        app.campaign_service.queue_launch(
             campaign_id=campaign_id,
             use_real_email=use_real_email
         )
-        
-        if result['success']:
-            flash(
-                f'Campaign launched successfully! {result["emails_sent"]} emails sent.',
-                'success'
-            )
-        else:
-            flash(f'Campaign launch failed: {result["message"]}', 'warning')
-            
     except ValueError as e:
+        if wants_json:
+            return jsonify({'error': str(e)}), 409
         flash(f'Error launching campaign: {str(e)}', 'danger')
+        return redirect(url_for('campaign_detail', campaign_id=campaign_id))
+    
+    status_url = url_for('campaign_detail', campaign_id=campaign_id)
+    if wants_json:
+        return jsonify({'campaign_id': campaign_id, 'status': 'Sending'}), 202, {'Location': status_url}
+    
+    flash('Campaign dispatching... Emails are being sent in the background.', 'info')
+    return redirect(status_url)
+
+
+@app.route('/campaigns/<campaign_id>/refresh-segment', methods=['POST'])
+@login_required
+def campaign_refresh_segment(campaign_id):
+    """
+    Refresh segment route - recomputes a draft campaign's target audience.
+    
+    Args:
+        campaign_id: Campaign unique identifier
+    """
+    try:
+        segment_size = app.campaign_service.refresh_segment(campaign_id)
+        flash(f'Target segment refreshed: {segment_size} customers.', 'success')
+    except ValueError as e:
+        flash(f'Error refreshing segment: {str(e)}', 'danger')
     
     return redirect(url_for('campaign_detail', campaign_id=campaign_id))
 
@@ -440,10 +620,12 @@ def campaign_analytics(campaign_id):
         campaign_id: Campaign unique identifier
     """
     # Delegate to Service Layer for performance calculation
+    # (load the campaign once and share it across the analytics calls)
+    campaign = app.campaign_service.get_campaign_by_id(campaign_id)
     try:
-        performance = app.analytics_service.get_campaign_performance(campaign_id)
-        geo_dist = app.analytics_service.get_geographic_distribution(campaign_id)
-        device_dist = app.analytics_service.get_device_distribution(campaign_id)
+        performance = app.analytics_service.get_campaign_performance(campaign_id, campaign)
+        geo_dist = app.analytics_service.get_geographic_distribution(campaign_id, campaign)
+        device_dist = app.analytics_service.get_device_distribution(campaign_id, campaign)
         
         # Prepare data for Chart.js
         geo_labels = list(geo_dist.keys())
@@ -463,6 +645,35 @@ def campaign_analytics(campaign_id):
         return redirect(url_for('campaigns_list'))
 
 
+# ============================================================================
+# ROUTES - JSON API
+# ============================================================================
+
+@app.route('/api/campaigns')
+@login_required
+def api_campaigns():
+    """
+    Campaigns JSON API - one page of campaigns, newest first.
+    
+    Query parameters:
+    - after: ID of the last campaign of the previous page (keyset cursor)
+    - limit: Page size (capped at API_MAX_PAGE_SIZE)
+    """
+    after = request.args.get('after') or None
+    try:
+        limit = int(request.args.get('limit', app.config['CAMPAIGNS_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    limit = max(1, min(limit, app.config['API_MAX_PAGE_SIZE']))
+    
+    try:
+        page = app.campaign_service.get_page(after=after, limit=limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(page)
+
+
 # ============================================================================
 # ERROR HANDLERS
 # ============================================================================
@@ -488,6 +699,12 @@ def datetime_format(value, format='%B %d, %Y at %I:%M %p'):
     """Format datetime objects in templates."""
     if value is None:
         return ''
+    return _format_datetime(value, format)
+
+
+@lru_cache(maxsize=4096)
+def _format_datetime(value, format):
+    """strftime() memoized by (value, format); campaign dates repeat on every render."""
     return value.strftime(format)
 
 